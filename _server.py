@@ -7,16 +7,30 @@ from server.files import create_files_routes
 from server.project import create_project_routes
 from server.split import create_split_routes  
 from server.status import create_status_routes
+from server.jobs import StatusStore
+from server.utils import large_file_buffers
 
 app = Flask(__name__)
 CORS(app)
 
+# Debug mode would otherwise turn on the per-request debug logging; LOG_LEVEL=DEBUG brings it back
+app.logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING').upper())
+
+# Behind Apache/lighttpd with mod_xsendfile, let the web server send file bodies
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+
+# Behind nginx, internal location that aliases the projects directory (e.g. /_protected_audio/)
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX', '')
+
+# Otherwise stream file bodies in 256 KB reads rather than 8 KB ones
+app.wsgi_app = large_file_buffers(app.wsgi_app)
+
 # Base directory for projects
 PROJECTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'projects')
 WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web')
 
-# Global dictionary to track processing status
-processing_status = {}
+# Global dictionary to track processing status, bounded to the most recent jobs
+processing_status = StatusStore(maxsize=1024)
 
 # Ensure projects directory exists
 os.makedirs(PROJECTS_DIR, exist_ok=True)
@@ -0,0 +1,39 @@
+"""
+Completion marker for a raw file's splits folder.
+
+run_all.py and the web server write it once a pipeline run has processed a file
+completely, and check it to skip files nothing has changed for since.
+"""
+
+import json
+import os
+
+# Written to a file's splits folder once a run has processed it completely
+DONE_MARKER = '.run_all_done.json'
+
+def already_processed(raw_file_path, output_dir, settings_file, segment):
+    """Whether an earlier run finished this file (with segmentation, if asked for) and nothing changed since.
+    
+    The marker must be newer than the raw file, the project settings and the output folder itself,
+    so deleting or replacing any output (e.g. a granular clean) makes the file run again.
+    """
+    marker = os.path.join(output_dir, DONE_MARKER)
+    try:
+        marker_mtime = os.stat(marker).st_mtime_ns
+        with open(marker, 'r') as f:
+            done = json.load(f)
+        newest_input = max(os.stat(raw_file_path).st_mtime_ns, os.stat(output_dir).st_mtime_ns)
+    except (OSError, ValueError):
+        return False
+    if segment and not done.get('segment'):
+        return False
+    try:
+        newest_input = max(newest_input, os.stat(settings_file).st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return marker_mtime >= newest_input
+
+def mark_processed(output_dir, segment):
+    """Record that output_dir holds the complete outputs of its raw file"""
+    with open(os.path.join(output_dir, DONE_MARKER), 'w') as f:
+        json.dump({'segment': segment}, f)
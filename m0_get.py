@@ -220,47 +220,85 @@ async def get_podcasts(base_url, output_dir='./aidea', max_pages=10, use_custom_
                 download_mp3(mp3_url, file_path, override=override)
 
 # New function to download individual URLs
-async def download_urls(urls, output_dir='./raw', override=False):
-    """Download individual URLs to the specified directory"""
+async def download_urls(urls, output_dir='./raw', override=False, max_concurrent=5, progress_callback=None):
+    """
+    Download individual URLs to the specified directory, up to max_concurrent at a time.
+    
+    progress_callback, if given, is called as progress_callback(done, total) on the
+    event loop thread each time a URL finishes (successfully or not).
+    
+    Returns {"downloaded": [...], "failed": [...], "skipped": [...], "total": n}; a URL whose
+    output name an earlier URL of the batch already uses is skipped, with the reason.
+    """
     os.makedirs(output_dir, exist_ok=True)
     
     downloaded_files = []
     failed_files = []
+    skipped_files = []
+    semaphore = asyncio.Semaphore(max_concurrent)
+    completed = 0
+    
+    async def download_one(url, file_name):
+        nonlocal completed
+        try:
+            async with semaphore:
+                print(f"Downloading {url}...")
+                file_path = os.path.join(output_dir, file_name)
+                
+                # Check if file exists and skip if not overriding
+                if not override and os.path.exists(file_path):
+                    print(f"Skipping {file_name}, already exists.")
+                    return file_name
+                
+                # wget/ffmpeg block, so keep them off the event loop
+                await asyncio.to_thread(download_mp3, url, file_path, override=override)
+                print(f"Successfully downloaded: {file_name}")
+                return file_name
+        finally:
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, len(tasks))
     
+    # Resolve output names up front so two URLs never write the same file concurrently
+    tasks = []
+    batch_names = {}
     for url in urls:
         url = url.strip()
         if not url:
             continue
-            
+        
         try:
-            print(f"Downloading {url}...")
-            
             # Get sanitized filename and ensure WAV extension for output
             original_name = get_filename_from_url(url)
             if original_name.lower().endswith(('.mp3', '.m4a')):
                 file_name = original_name.rsplit('.', 1)[0] + '.wav'
             else:
                 file_name = original_name + '.wav' if not original_name.lower().endswith('.wav') else original_name
-            
-            file_path = os.path.join(output_dir, file_name)
-            
-            # Check if file exists and skip if not overriding
-            if not override and os.path.exists(file_path):
-                print(f"Skipping {file_name}, already exists.")
-                downloaded_files.append(file_name)
-                continue
-            
-            download_mp3(url, file_path, override=override)
-            downloaded_files.append(file_name)
-            print(f"Successfully downloaded: {file_name}")
-            
         except Exception as e:
             print(f"Failed to download {url}: {str(e)}")
             failed_files.append({"url": url, "error": str(e)})
+            continue
+        
+        if file_name in batch_names:
+            reason = f"output name {file_name} already used by {batch_names[file_name]}"
+            print(f"Skipping {url}, {reason}.")
+            skipped_files.append({"url": url, "reason": reason})
+            continue
+        batch_names[file_name] = url
+        tasks.append((url, download_one(url, file_name)))
+    
+    results = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+    for (url, _), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"Failed to download {url}: {str(result)}")
+            failed_files.append({"url": url, "error": str(result)})
+        else:
+            downloaded_files.append(result)
     
     return {
         "downloaded": downloaded_files,
         "failed": failed_files,
+        "skipped": skipped_files,
         "total": len(urls)
     }
 
@@ -2,9 +2,13 @@
 import os
 import time
 import json
+import random
 import requests
 import sys
+import tempfile
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
  
@@ -16,11 +20,21 @@ if api_key is None:
 
 api_base = "https://api.soniox.com"
  
+# Poll delays grow from POLL_INITIAL_DELAY to POLL_MAX_DELAY seconds while a transcription runs
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 8.0
+
 session = requests.Session()
 session.headers["Authorization"] = f"Bearer {api_key}"
+# Keep-alive connections shared by all calls (m7_validate transcribes from several threads);
+# idempotent requests are retried on transient gateway errors, uploads (POST) are not
+session.mount(api_base, HTTPAdapter(
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+))
  
  
 def poll_until_complete(transcription_id):
+    delay = POLL_INITIAL_DELAY
     while True:
         res = session.get(f"{api_base}/v1/transcriptions/{transcription_id}")
         res.raise_for_status()
@@ -31,7 +45,29 @@ def poll_until_complete(transcription_id):
             raise Exception(
                 f"Transcription failed: {data.get('error_message', 'Unknown error')}"
             )
-        time.sleep(1)
+        # Short clips finish within the first polls, long files back off instead of polling every second
+        time.sleep(delay + random.uniform(0, 0.25))
+        delay = min(delay * 1.5, POLL_MAX_DELAY)
+
+
+def stream_transcript(url, output_file):
+    """Download url into output_file through a temp file in the same folder, so an interrupted
+    download never leaves a truncated file that run.py would take as already transcribed"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_file) or ".", prefix="." + os.path.basename(output_file) + ".", suffix=".tmp")
+    try:
+        # mkstemp creates the file 0600; match a normally created file
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f, session.get(url, stream=True) as res:
+            res.raise_for_status()
+            for chunk in res.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def transcribe_file(input_file, output_file="output.json", skip_file_output=False, language=None):
@@ -69,15 +105,19 @@ def transcribe_file(input_file, output_file="output.json", skip_file_output=Fals
         poll_until_complete(transcription_id)
 
         # Get the transcript text
-        res = session.get(f"{api_base}/v1/transcriptions/{transcription_id}/transcript")
-        res.raise_for_status()
-        data = res.json()
-
-        # ✅ Store full JSON to file (unless skipped)
-        if not skip_file_output:
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+        transcript_url = f"{api_base}/v1/transcriptions/{transcription_id}/transcript"
+        if skip_file_output:
+            res = session.get(transcript_url)
+            res.raise_for_status()
+            data = res.json()
+        else:
+            # ✅ Stream the full JSON to a temp file as received, then parse it once (no re-encoding);
+            # iter_content undoes any gzip transfer encoding, unlike res.raw
+            stream_transcript(transcript_url, output_file)
             print(f"Full transcription JSON saved to {output_file}")
+            
+            with open(output_file, "rb") as f:
+                data = json.load(f)
 
         # Delete the transcription
         res = session.delete(f"{api_base}/v1/transcriptions/{transcription_id}")
@@ -41,6 +41,7 @@ Requirements:
 
 import argparse
 import json
+import os
 import re
 import subprocess
 from dataclasses import dataclass, replace
@@ -229,6 +230,17 @@ def ffmpeg_extract(in_path: Path, start_ms: int, end_ms: int, out_wav: Path, pad
     cmd.append(str(out_wav))
     subprocess.run(cmd, check=True)
 
+def write_json(path: Path, data: dict) -> None:
+    """Write data as indented JSON to a temp file next to path, then swap it in with os.replace."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open('w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
 # ----------------------------
 # Sentence building
 # ----------------------------
@@ -879,8 +891,7 @@ def segment_audio(audio_path, json_path, outfile, silence_db: int = SILENCE_DB,
         'total_segments': len(segments)
     }
     
-    with raw_outfile.open('w', encoding='utf-8') as f:
-        json.dump(raw_output_data, f, indent=2, ensure_ascii=False)
+    write_json(raw_outfile, raw_output_data)
     
     print(f"[ok] Saved raw segments (before any processing) to {raw_outfile}")
 
@@ -966,8 +977,8 @@ def segment_audio(audio_path, json_path, outfile, silence_db: int = SILENCE_DB,
         'total_segments': len(segments)
     }
     
-    with outfile.open('w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    # The web UI may be reading the previous segments file while a refresh runs
+    write_json(outfile, output_data)
     
     print(f"[ok] Computed {len(segments)} segments and saved to {outfile}")
 
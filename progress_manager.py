@@ -16,6 +16,18 @@ import threading
 import time
 
 
+class _LogPanel:
+    """Log area that builds its panel from the current messages only when the live display refreshes"""
+    
+    def __init__(self, manager):
+        self.manager = manager
+        
+    def __rich__(self):
+        with self.manager.lock:
+            log_text = "\n".join(self.manager.log_messages)
+        return Panel(log_text, title="Processing Log", border_style="dim")
+
+
 class ProgressManager:
     """Split-screen progress manager with fixed progress bars and scrollable logs."""
     
@@ -75,10 +87,8 @@ class ProgressManager:
             Panel(self.progress, title="Progress", border_style="green")
         )
         
-        # Set up logs area
-        self.layout["logs"].update(
-            Panel("", title="Processing Log", border_style="dim")
-        )
+        # Set up logs area; it is rendered at most refresh_per_second times however often print_log is called
+        self.layout["logs"].update(_LogPanel(self))
         
         # Start live display
         self.live = Live(self.layout, console=self.console, refresh_per_second=4)
@@ -182,14 +192,7 @@ class ProgressManager:
             
             # Keep only recent messages
             if len(self.log_messages) > self.max_log_lines:
-                self.log_messages = self.log_messages[-self.max_log_lines:]
-            
-            # Update logs panel
-            if self.layout and self.is_running:
-                log_text = "\n".join(self.log_messages)
-                self.layout["logs"].update(
-                    Panel(log_text, title="Processing Log", border_style="dim")
-                )
+                del self.log_messages[:-self.max_log_lines]
             
     def __enter__(self):
         """Context manager entry."""
@@ -10,7 +10,7 @@ Usage:
 
 Arguments:
     project_name: Name of the project to process
-    --override: Override existing output files (optional)
+    --override: Override existing output files; without it, files a previous run completed are skipped (optional)
     --segment: Enable segmentation (optional)
     --validate: Run validation on the project's segments (optional)
     --clean: Remove files that fail validation (can be used alone if bad_segments.json exists) (optional)
@@ -38,15 +38,23 @@ os.environ['NUMBER_THREADS'] = '32'  # Set to 1 to avoid parallel processing iss
 
 import sys
 import argparse
+import collections
+import contextlib
+import io
 import json
+import traceback
 from pathlib import Path
 from run import process_file
 from m7_validate import validate_project, copy_good_segments_to_project_audio
 from m8_meta import generate_metadata
 from progress_manager import ProgressManager
+from done_marker import already_processed, mark_processed
 
-def main():
-    """Main function to process all files in a project."""
+# Supported raw audio formats, matched against the lowercased file extension
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.m4a', '.flac', '.ogg'})
+
+def main(argv=None):
+    """Main function to process all files in a project (argv defaults to the command line)."""
     parser = argparse.ArgumentParser(description="Process all audio files in a project's raw directory.")
     parser.add_argument("project_name", type=str, help="Name of the project to process")
     parser.add_argument("--override", action="store_true", help="Override existing output files")
@@ -59,7 +67,7 @@ def main():
     parser.add_argument("--max-workers", type=int, default=4, help="Maximum number of parallel workers for validation (default: 4)")
     parser.add_argument("--force-revalidate", action="store_true", help="Force re-validation of all segments, ignoring existing bad_segments.json files")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
    
     
     # Base directory for projects
@@ -100,17 +108,14 @@ def main():
     # Create splits directory if it doesn't exist
     os.makedirs(splits_dir, exist_ok=True)
     
-    # Find all audio files in the raw directory
-    audio_extensions = ('.mp3', '.wav', '.m4a', '.flac', '.ogg')
-    audio_files = []
-    
-    for item in sorted(os.listdir(raw_dir)):
-        if item.lower().endswith(audio_extensions):
-            audio_files.append(item)
+    # Find all audio files in the raw directory (one scandir pass, entry types come with it)
+    with os.scandir(raw_dir) as it:
+        audio_files = sorted(entry.name for entry in it
+                             if entry.is_file() and os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS)
     
     if not audio_files:
         print(f"No audio files found in {raw_dir}")
-        print(f"Supported formats: {', '.join(audio_extensions)}")
+        print(f"Supported formats: {', '.join(sorted(AUDIO_EXTENSIONS))}")
         sys.exit(1)
     
     print(f"Found {len(audio_files)} audio files in project '{args.project_name}':")
@@ -152,6 +157,7 @@ def main():
         
         # Process each file
         success_count = 0
+        skipped_count = 0
         failed_files = []
         current_step = 1
         
@@ -167,6 +173,14 @@ def main():
                 raw_file_path = os.path.join(raw_dir, filename)
                 output_dir = os.path.join(splits_dir, filename)
                 
+                # Skip files a previous run already finished, unless overriding
+                if not args.override and already_processed(raw_file_path, output_dir, settings_file, args.segment):
+                    pm.print_log(f"✓ Already processed, skipping: {filename}")
+                    skipped_count += 1
+                    pm.update_file(1)
+                    pm.print_log("")
+                    continue
+                
                 # Create output directory for this file
                 os.makedirs(output_dir, exist_ok=True)
                 
@@ -176,6 +190,9 @@ def main():
                 if success is not False:  # process_file returns None on success, False on failure
                     pm.print_log(f"✓ Successfully processed: {filename}")
                     success_count += 1
+                    # --skip leaves splits without transcriptions, so such a run is not complete
+                    if not args.skip:
+                        mark_processed(output_dir, args.segment)
                 else:
                     pm.print_log(f"✗ Failed to process: {filename}")
                     failed_files.append(filename)
@@ -197,6 +214,7 @@ def main():
         pm.print_log("=" * 60)
         pm.print_log(f"Total files: {len(audio_files)}")
         pm.print_log(f"Successfully processed: {success_count}")
+        pm.print_log(f"Skipped (already processed): {skipped_count}")
         pm.print_log(f"Failed: {len(failed_files)}")
 
         # Handle validation and/or cleaning
@@ -286,5 +304,47 @@ def main():
             pm.print_log(f"Output directory: {splits_dir}")
 
 
+class TailWriter(io.TextIOBase):
+    """Text stream that keeps only the last limit characters written to it"""
+    
+    def __init__(self, limit):
+        self.limit = limit
+        self._chunks = collections.deque()
+        self._size = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        # Drop whole chunks while the rest still covers the last limit characters
+        while self._size - len(self._chunks[0]) >= self.limit:
+            self._size -= len(self._chunks.popleft())
+        return len(text)
+    
+    def getvalue(self):
+        return ''.join(self._chunks)[-self.limit:]
+
+def run_captured(argv, tail=4000):
+    """Run main(argv) in this process with its output captured, like a subprocess run.
+    
+    Returns (exit code, stdout, stderr), keeping only the last tail characters of each so
+    long runs do not hold their whole log. Used by the web server to run projects in its
+    pipeline worker processes, where the models are already loaded.
+    """
+    stdout, stderr = TailWriter(tail), TailWriter(tail)
+    code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            main(argv)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
 if __name__ == "__main__":
     main()
@@ -1,132 +1,106 @@
 # Files endpoints
 from flask import Blueprint, Response, jsonify, request, send_from_directory, send_file
 import os
+import io
 import json
 import shutil
 import subprocess
-import threading
 import time
-import asyncio
-from datetime import datetime
 from werkzeug.utils import secure_filename
 from pathlib import Path
-from run import process_file
+from urllib.parse import urlsplit, urlunsplit
 from m0_get import download_urls
+from server.jobs import PROCESS_EXECUTOR, submit_coroutine, update_status, finish_status, submit_job, process_file_background
+from server.utils import UnsafePathError, safe_join, project_dir, atomic_rename_noreplace, ensure_dir, json_bytes, dir_etag, LRUCache, LISTING_CACHE_SIZE
 
 files_bp = Blueprint('files', __name__)
 
-def download_urls_background(project_name, urls, projects_dir, processing_status):
-    """Background function to download URLs to project raw folder"""
+# Encoded get_files responses: directory path -> (dir_etag, JSON bytes)
+_listing_cache = LRUCache(LISTING_CACHE_SIZE)
+
+# Project folders whose entries can be deleted through delete_file
+DELETABLE_FILETYPES = frozenset({'raw', 'audio', 'splits'})
+
+# Copy uploads in 1 MB chunks instead of Werkzeug's 16 KB default
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+def save_upload(file, file_path):
+    """Write an uploaded file to disk, copying in-kernel with sendfile when the upload is spooled to a real file"""
+    stream = file.stream
+    try:
+        src_fd = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        # Small uploads are kept in memory (BytesIO)
+        src_fd = None
+    
+    with open(file_path, 'wb') as dst:
+        if src_fd is not None and hasattr(os, 'sendfile'):
+            offset = 0
+            try:
+                while True:
+                    sent = os.sendfile(dst.fileno(), src_fd, offset, UPLOAD_CHUNK_SIZE)
+                    if sent == 0:
+                        return
+                    offset += sent
+            except OSError:
+                # Platform cannot sendfile between regular files, start over with a plain copy
+                dst.seek(0)
+                dst.truncate()
+        shutil.copyfileobj(stream, dst, UPLOAD_CHUNK_SIZE)
+
+def normalize_url(url):
+    """Normalize a URL for duplicate detection (lowercase scheme/host, no trailing slash)"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, parts.fragment))
+
+async def download_urls_background(project_name, urls, projects_dir, processing_status):
+    """Background coroutine to download URLs to project raw folder"""
     process_key = f"{project_name}_url_download"
     
     try:
         processing_status[process_key] = {
             'status': 'processing',
-            'started_at': datetime.now().isoformat(),
+            'started_at': time.time(),
             'progress': 0,
             'message': f'Starting download of {len(urls)} URLs...'
         }
         
         # Prepare output directory
-        output_dir = os.path.join(projects_dir, project_name, 'raw')
-        os.makedirs(output_dir, exist_ok=True)
+        output_dir = ensure_dir(os.path.join(projects_dir, project_name, 'raw'))
         
-        # Run the download function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        update_status(processing_status, process_key, progress=20, message='Downloading files...')
         
-        processing_status[process_key]['progress'] = 20
-        processing_status[process_key]['message'] = 'Downloading files...'
+        def on_progress(done, total):
+            update_status(processing_status, process_key,
+                progress=20 + 80 * done // total,
+                message=f'Downloaded {done}/{total} URLs...'
+            )
         
-        result = loop.run_until_complete(download_urls(urls, output_dir, override=False))
-        loop.close()
+        result = await download_urls(urls, output_dir, override=False, progress_callback=on_progress)
         
         # Update status based on results
         downloaded_count = len(result['downloaded'])
         failed_count = len(result['failed'])
+        skipped = result['skipped']
         total_count = result['total']
         
-        if failed_count == 0:
-            processing_status[process_key] = {
-                'status': 'completed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': f'Successfully downloaded {downloaded_count}/{total_count} files'
-            }
-        elif downloaded_count > 0:
-            processing_status[process_key] = {
-                'status': 'completed_with_errors',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': f'Downloaded {downloaded_count}/{total_count} files ({failed_count} failed)'
-            }
-        else:
-            processing_status[process_key] = {
-                'status': 'failed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 0,
-                'message': f'All downloads failed'
-            }
-            
-    except Exception as e:
-        processing_status[process_key] = {
-            'status': 'failed',
-            'started_at': processing_status.get(process_key, {}).get('started_at', datetime.now().isoformat()),
-            'completed_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': f'Error: {str(e)}'
-        }
-
-def process_file_background(project_name, base_filename, file_path, projects_dir, processing_status):
-    """Background function to process a file through the pipeline"""
-    process_key = f"{project_name}_{base_filename}"
-    
-    try:
-        processing_status[process_key] = {
-            'status': 'processing',
-            'started_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': 'Starting processing...'
-        }
-        
-        # Create output directory structure
-        output_dir = os.path.join(projects_dir, project_name, 'splits', base_filename)
-        os.makedirs(output_dir, exist_ok=True)
-        
-        processing_status[process_key]['progress'] = 10
-        processing_status[process_key]['message'] = 'Cleaning audio...'
+        problems = []
+        if failed_count:
+            problems.append(f'{failed_count} failed')
+        if skipped:
+            problems.append(f'{len(skipped)} skipped, output name already used')
         
-        # Call the custom processing function
-        success = process_file(file_path, output_dir, False, False)
-        
-        if success:
-            processing_status[process_key] = {
-                'status': 'completed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': 'Processing completed successfully'
-            }
+        if not problems:
+            finish_status(processing_status, process_key, 'completed', f'Successfully downloaded {downloaded_count}/{total_count} files')
+        elif downloaded_count > 0:
+            finish_status(processing_status, process_key, 'completed_with_errors', f'Downloaded {downloaded_count}/{total_count} files ({", ".join(problems)})',
+                skipped=skipped
+            )
         else:
-            processing_status[process_key] = {
-                'status': 'failed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 0,
-                'message': 'Processing failed'
-            }
+            finish_status(processing_status, process_key, 'failed', f'No files downloaded ({", ".join(problems)})', skipped=skipped)
             
     except Exception as e:
-        processing_status[process_key] = {
-            'status': 'failed',
-            'started_at': processing_status.get(process_key, {}).get('started_at', datetime.now().isoformat()),
-            'completed_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': f'Error: {str(e)}'
-        }
+        finish_status(processing_status, process_key, 'failed', f'Error: {str(e)}')
 
 def create_files_routes(projects_dir, processing_status):
     """Create and return the files blueprint with injected dependencies"""
@@ -137,17 +111,36 @@ def create_files_routes(projects_dir, processing_status):
         try:
             if filetype == "split": 
                 filetype = "splits"
-            files_path = os.path.join(projects_dir, project_name, filetype)
-            files = []
+            files_path = project_dir(projects_dir, project_name, filetype)
+            
+            try:
+                etag = dir_etag(files_path)
+            except FileNotFoundError:
+                return jsonify([])
+            
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
             
-            if os.path.exists(files_path):
-                for item in os.listdir(files_path):
-                    file_path = os.path.join(files_path, item)
-                    if filetype != 'splits' and os.path.isfile(file_path):
-                        files.append(item)
-                    elif filetype == 'splits' and not os.path.isfile(file_path):
-                        files.append(item)
-            return jsonify(files)
+            cached = _listing_cache.get(files_path)
+            if cached and cached[0] == etag:
+                body = cached[1]
+            else:
+                # scandir gives the entry type from the directory read, no stat per entry
+                with os.scandir(files_path) as it:
+                    if filetype == 'splits':
+                        files = [entry.name for entry in it if not entry.is_file()]
+                    else:
+                        files = [entry.name for entry in it if entry.is_file()]
+                body = json_bytes(files)
+                _listing_cache[files_path] = (etag, body)
+            
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            return response
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -163,28 +156,37 @@ def create_files_routes(projects_dir, processing_status):
                 return jsonify({'error': 'No file selected'}), 400
             
             filename = secure_filename(file.filename)
-            files_path = os.path.join(projects_dir, project_name, filetype)
-            os.makedirs(files_path, exist_ok=True)
+            files_path = ensure_dir(project_dir(projects_dir, project_name, filetype))
             
-            file_path = os.path.join(files_path, filename)
-            file.save(file_path)
+            file_path = safe_join(files_path, filename)
+            save_upload(file, file_path)
             
             # If uploaded to raw directory, automatically trigger processing
             if filetype == 'raw':
                 base_filename = os.path.splitext(filename)[0]
-                thread = threading.Thread(
-                    target=process_file_background,
-                    args=(project_name, base_filename, file_path, projects_dir, processing_status)
-                )
-                thread.daemon = True
-                thread.start()
+                process_key = f"{project_name}_{base_filename}"
+                output_dir = os.path.join(projects_dir, project_name, 'splits', base_filename)
+                
+                # Start background processing on the warm pipeline workers (None: a run for this file is still going)
+                if submit_job(
+                    PROCESS_EXECUTOR, process_key, process_file_background,
+                    project_name, base_filename, file_path,
+                    output_dir, processing_status, False, False,
+                    processing_status=processing_status
+                ) is None:
+                    return jsonify({
+                        'message': f'File {filename} uploaded successfully, it is already being processed',
+                        'processing_key': process_key
+                    }), 201
                 
                 return jsonify({
                     'message': f'File {filename} uploaded successfully and processing started',
-                    'processing_key': f"{project_name}_{base_filename}"
+                    'processing_key': process_key
                 }), 201
             
             return jsonify({'message': f'File {filename} uploaded successfully'}), 201
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -198,18 +200,20 @@ def create_files_routes(projects_dir, processing_status):
                 return jsonify({'error': 'New filename is required'}), 400
             
             new_filename = secure_filename(new_filename)
-            files_path = os.path.join(projects_dir, project_name, filetype)
-            old_file_path = os.path.join(files_path, filename)
-            new_file_path = os.path.join(files_path, new_filename)
+            files_path = project_dir(projects_dir, project_name, filetype)
+            old_file_path = safe_join(files_path, filename)
+            new_file_path = safe_join(files_path, new_filename)
             
-            if not os.path.exists(old_file_path):
+            # Fails atomically if the target exists, no separate exists checks
+            try:
+                atomic_rename_noreplace(old_file_path, new_file_path)
+            except FileNotFoundError:
                 return jsonify({'error': 'File not found'}), 404
-            
-            if os.path.exists(new_file_path):
+            except FileExistsError:
                 return jsonify({'error': 'File with new name already exists'}), 409
-            
-            os.rename(old_file_path, new_file_path)
             return jsonify({'message': f'File renamed from {filename} to {new_filename}'}), 200
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -217,13 +221,27 @@ def create_files_routes(projects_dir, processing_status):
     def delete_file(project_name, filetype, filename):
         """Delete a file"""
         try:
-            file_path = os.path.join(projects_dir, project_name, filetype, filename)
+            if filetype == "split":
+                filetype = "splits"
+            # Only known folders: e.g. '.' would make the project root the base and let 'raw' name a whole folder
+            if filetype not in DELETABLE_FILETYPES:
+                return jsonify({'error': 'Invalid file type'}), 400
+            file_path = safe_join(project_dir(projects_dir, project_name, filetype), filename)
             
-            if not os.path.exists(file_path):
+            # Single unlink instead of a stat + unlink
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
                 return jsonify({'error': 'File not found'}), 404
-            
-            os.remove(file_path)
+            except IsADirectoryError:
+                # Only split folders are listed as entries, as entries of the splits filetype
+                if filetype != 'splits':
+                    return jsonify({'error': 'Not a file'}), 400
+                shutil.rmtree(file_path)
+                ensure_dir.cache_clear()
             return jsonify({'message': f'File {filename} deleted successfully'}), 200
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -237,31 +255,36 @@ def create_files_routes(projects_dir, processing_status):
             if not urls_text:
                 return jsonify({'error': 'No URLs provided'}), 400
             
-            # Parse URLs from text (one per line)
-            urls = [url.strip() for url in urls_text.split('\n') if url.strip()]
+            # Parse URLs from text (one per line), dropping duplicates but keeping order;
+            # the normalized form is only the dedupe key, the first URL as given is downloaded
+            raw_urls = [url.strip() for url in urls_text.split('\n') if url.strip()]
+            seen = {}
+            for url in raw_urls:
+                seen.setdefault(normalize_url(url), url)
+            urls = list(seen.values())
             
             if not urls:
                 return jsonify({'error': 'No valid URLs found'}), 400
             
             # Check if project exists
-            project_path = os.path.join(projects_dir, project_name)
+            project_path = project_dir(projects_dir, project_name)
             if not os.path.exists(project_path):
                 return jsonify({'error': 'Project not found'}), 404
             
-            # Start background download process
-            thread = threading.Thread(
-                target=download_urls_background,
-                args=(project_name, urls, projects_dir, processing_status)
+            # Run the batch on the shared background event loop
+            submit_coroutine(
+                download_urls_background(project_name, urls, projects_dir, processing_status)
             )
-            thread.daemon = True
-            thread.start()
             
             return jsonify({
                 'message': f'Started download of {len(urls)} URLs',
                 'processing_key': f"{project_name}_url_download",
-                'urls_count': len(urls)
+                'urls_count': len(urls),
+                'deduped': len(raw_urls) - len(urls)
             }), 201
             
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
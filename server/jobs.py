@@ -0,0 +1,287 @@
+# Background job pools shared by the blueprints
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+import asyncio
+import atexit
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from done_marker import mark_processed
+from server.utils import ensure_dir
+
+logger = logging.getLogger(__name__)
+
+# How many files are processed at once; PIPELINE_WORKERS overrides the default
+# (e.g. to match GPU memory), extra jobs wait in the executor queue. Every
+# pipeline worker is a process with its own copy of the models, so the default
+# stays small whatever the interpreter build
+DEFAULT_PIPELINE_WORKERS = 2
+PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', 0))
+if not PIPELINE_WORKERS:
+    PIPELINE_WORKERS = DEFAULT_PIPELINE_WORKERS
+    # Pool workers re-import the server module, only the server itself reports this
+    if multiprocessing.parent_process() is None:
+        logger.info("Running at most %d processing jobs at a time, each in a worker process with its own models "
+                       "(set PIPELINE_WORKERS to change this)", PIPELINE_WORKERS)
+
+# Pipeline processing (process_file) jobs
+PROCESS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=PIPELINE_WORKERS,
+    thread_name_prefix='proc'
+)
+
+# Other background jobs (project export), sized by EXECUTOR_MAX_WORKERS
+JOB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('EXECUTOR_MAX_WORKERS', 4)),
+    thread_name_prefix='job'
+)
+
+# Start method for worker processes: forkserver avoids forking the threaded server process
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+class WarmProcessPool:
+    """ProcessPoolExecutor that replaces itself once a worker process dies
+    
+    A worker killed mid-job (OOM while loading models, a native crash, a failing
+    initializer) breaks a ProcessPoolExecutor for good. The jobs it had running or queued fail
+    with BrokenProcessPool; the next submit starts a fresh pool instead of failing too.
+    """
+    
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+    
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=POOL_CONTEXT,
+            initializer=self.initializer,
+            initargs=self.initargs
+        )
+    
+    def _replace(self, broken):
+        """Swap in a fresh pool for broken, unless another caller already did"""
+        with self._lock:
+            if self._pool is broken:
+                logger.warning("A worker process died, starting a new process pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+            return self._pool
+    
+    def submit(self, fn, *args):
+        with self._lock:
+            pool = self._pool
+        try:
+            return pool.submit(fn, *args)
+        except BrokenProcessPool:
+            return self._replace(pool).submit(fn, *args)
+    
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._lock:
+            self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+# Worker processes that run the pipeline itself (process_file), outside this
+# process's GIL. Each worker imports run.py once up front, so models loaded at
+# import time (e.g. ClearVoice in m1_clean) stay warm between files.
+PIPELINE_POOL = WarmProcessPool(PIPELINE_WORKERS, initializer=importlib.import_module, initargs=('run',))
+
+# Single worker process for project-wide run_all runs, kept apart from PIPELINE_POOL so a
+# long run never holds a file-processing worker and a crash in it cannot break that pool.
+# The worker imports run_all up front, which sets its process-wide settings (NUMBER_THREADS)
+# before importing run, just like the CLI.
+RUN_ALL_POOL = WarmProcessPool(1, initializer=importlib.import_module, initargs=('run_all',))
+
+# Long-lived event loop for async background work (URL download batches),
+# so batches do not pay for a fresh loop or worker thread each time
+BACKGROUND_LOOP = asyncio.new_event_loop()
+threading.Thread(target=BACKGROUND_LOOP.run_forever, name='bg-loop', daemon=True).start()
+
+def submit_coroutine(coro):
+    """Schedule a coroutine on the shared background loop without waiting for it"""
+    return asyncio.run_coroutine_threadsafe(coro, BACKGROUND_LOOP)
+
+class StatusStore(OrderedDict):
+    """processing_status mapping bounded to maxsize entries; the least recently updated finished jobs are evicted first"""
+    
+    def __init__(self, maxsize=1024):
+        super().__init__()
+        self.maxsize = maxsize
+        self.version = 0
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                excess = len(self) - self.maxsize
+                finished = [k for k, entry in self.items() if entry.get('status') != 'processing']
+                for k in finished[:excess]:
+                    super().__delitem__(k)
+            self.version += 1
+            self._changed.notify_all()
+    
+    def snapshot(self):
+        """Consistent copy of all entries, safe to iterate while jobs keep updating"""
+        with self._lock:
+            return dict(self)
+    
+    def versioned_snapshot(self):
+        """(version, snapshot) taken together, so the version identifies exactly these entries"""
+        with self._lock:
+            return self.version, dict(self)
+    
+    def wait_for_change(self, version, timeout=None):
+        """Block until an entry is written after version (or timeout); returns (version, snapshot)"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version, dict(self)
+
+# Futures of jobs started through submit_job, by processing key, while they run
+JOB_FUTURES = {}
+JOB_FUTURES_LOCK = threading.Lock()
+
+def submit_job(executor, process_key, fn, *args, processing_status=None):
+    """Submit fn(*args) to executor and remember its future under process_key until it finishes
+    
+    Returns None without submitting when a job for process_key is still queued or running,
+    so two concurrent requests cannot both start the same job. With processing_status, the
+    job is marked as queued right away, so pollers never see a finished entry from an
+    earlier run while it waits for a free worker.
+    """
+    with JOB_FUTURES_LOCK:
+        running = JOB_FUTURES.get(process_key)
+        if running is not None and not running.done():
+            return None
+        if processing_status is not None:
+            processing_status[process_key] = {
+                'status': 'processing',
+                'started_at': time.time(),
+                'progress': 0,
+                'message': 'Queued for processing...'
+            }
+        future = executor.submit(fn, *args)
+        JOB_FUTURES[process_key] = future
+    
+    def forget(done):
+        with JOB_FUTURES_LOCK:
+            if JOB_FUTURES.get(process_key) is done:
+                JOB_FUTURES.pop(process_key, None)
+    
+    future.add_done_callback(forget)
+    return future
+
+def is_processing(processing_status, process_key):
+    """Whether a job for process_key is queued or running"""
+    future = JOB_FUTURES.get(process_key)
+    if future is not None and not future.done():
+        return True
+    return processing_status.get(process_key, {}).get('status') == 'processing'
+
+def active_keys(processing_status, prefix=''):
+    """Processing keys starting with prefix whose jobs are queued or running, in one pass each over the futures and the statuses"""
+    with JOB_FUTURES_LOCK:
+        keys = {key for key, future in JOB_FUTURES.items() if key.startswith(prefix) and not future.done()}
+    keys.update(key for key, entry in processing_status.snapshot().items()
+                if key.startswith(prefix) and entry.get('status') == 'processing')
+    return keys
+
+# Guards read-modify-write updates of processing_status entries
+STATUS_LOCK = threading.Lock()
+
+def update_status(processing_status, process_key, **fields):
+    """Swap in a copy of the status entry with fields updated, so pollers never see a half-updated entry"""
+    with STATUS_LOCK:
+        entry = dict(processing_status.get(process_key, {}))
+        entry.update(fields)
+        processing_status[process_key] = entry
+
+def finish_status(processing_status, process_key, status, message, **fields):
+    """Record the final state of a job: completed_at now, progress 100 (0 when it failed)"""
+    update_status(processing_status, process_key,
+        status=status,
+        completed_at=time.time(),
+        progress=0 if status == 'failed' else 100,
+        message=message,
+        **fields
+    )
+
+def _run_process_file(*args):
+    """run.process_file(*args), imported in the pool worker so the server process never loads the pipeline models"""
+    from run import process_file
+    return process_file(*args)
+
+def submit_pipeline(*args):
+    """Queue run.process_file(*args) on the pipeline worker pool"""
+    return PIPELINE_POOL.submit(_run_process_file, *args)
+
+def _run_all_captured(argv):
+    """run_all.run_captured(argv), imported in the run_all worker so run_all's models and
+    process-wide settings (e.g. NUMBER_THREADS) reach neither the server process nor the pipeline workers"""
+    from run_all import run_captured
+    return run_captured(argv)
+
+def submit_run_all(argv):
+    """Queue run_all.main(argv) on the run_all worker; the future gives (exit code, stdout, stderr)"""
+    return RUN_ALL_POOL.submit(_run_all_captured, argv)
+
+def record_pipeline_result(processing_status, process_key, future, on_success=None):
+    """Wait for a pipeline future and record its outcome in the status entry (calling on_success() first when it succeeded)"""
+    try:
+        # process_file returns None when it finishes normally
+        success = future.result()
+        
+        if success is not False:
+            if on_success is not None:
+                on_success()
+            finish_status(processing_status, process_key, 'completed', 'Processing completed successfully')
+        else:
+            finish_status(processing_status, process_key, 'failed', 'Processing failed')
+            
+    except Exception as e:
+        finish_status(processing_status, process_key, 'failed', f'Error: {str(e)}')
+
+def process_file_background(project_name, filename, file_path, output_dir, processing_status, *args):
+    """Background function to process a file through the pipeline (args after processing_status go to process_file)"""
+    process_key = f"{project_name}_{filename}"
+    processing_status[process_key] = {
+        'status': 'processing',
+        'started_at': time.time(),
+        'progress': 0,
+        'message': 'Starting processing...'
+    }
+    
+    try:
+        ensure_dir(output_dir)
+        future = submit_pipeline(file_path, output_dir, *args)
+        update_status(processing_status, process_key, progress=10, message='Cleaning audio...')
+    except Exception as e:
+        finish_status(processing_status, process_key, 'failed', f'Error: {str(e)}')
+        return
+    
+    # args continue process_file(file_path, output_dir, ...): override, segment, settings, skip;
+    # a complete run (not --skip) leaves the marker that refresh and run_all check
+    segment = len(args) > 1 and bool(args[1])
+    skip = len(args) > 3 and bool(args[3])
+    record_pipeline_result(processing_status, process_key, future,
+        on_success=None if skip else functools.partial(mark_processed, output_dir, segment))
+
+def shutdown_executors():
+    """Drop queued jobs and stop accepting new ones when the server exits"""
+    PROCESS_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    JOB_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    PIPELINE_POOL.shutdown(wait=False, cancel_futures=True)
+    RUN_ALL_POOL.shutdown(wait=False, cancel_futures=True)
+
+atexit.register(shutdown_executors)
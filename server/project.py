@@ -1,14 +1,17 @@
 # Projects endpoints
 from flask import Blueprint, Response, jsonify, request, send_from_directory, send_file
 import os
-import json
+import re
+import fnmatch
 import shutil
 import subprocess
-import threading
 import time
-from datetime import datetime
 from werkzeug.utils import secure_filename
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from m10_archive import archive_dataset
+from server.utils import UnsafePathError, project_dir, atomic_rename_noreplace, ensure_dir, fast_listdir, cached_listing, invalidate_listing, write_json_atomic, json_bytes
+from server.jobs import JOB_EXECUTOR, submit_job, is_processing, update_status, finish_status
 
 project_bp = Blueprint('project', __name__)
 
@@ -19,104 +22,61 @@ def export_project_background(project_name, processing_status):
     try:
         processing_status[process_key] = {
             'status': 'processing',
-            'started_at': datetime.now().isoformat(),
+            'started_at': time.time(),
             'progress': 0,
             'message': 'Starting export process...'
         }
         
-        # Import the archive function from m10_archive
-        from m10_archive import archive_dataset
-        
-        processing_status[process_key]['progress'] = 50
-        processing_status[process_key]['message'] = 'Archiving dataset...'
+        update_status(processing_status, process_key, progress=50, message='Archiving dataset...')
         
         success = archive_dataset(project_name)
         
         if success:
-            processing_status[process_key] = {
-                'status': 'completed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': 'Export completed successfully'
-            }
+            finish_status(processing_status, process_key, 'completed', 'Export completed successfully')
         else:
-            processing_status[process_key] = {
-                'status': 'failed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 0,
-                'message': 'Export failed'
-            }
+            finish_status(processing_status, process_key, 'failed', 'Export failed')
             
     except Exception as e:
-        processing_status[process_key] = {
-            'status': 'failed',
-            'started_at': processing_status.get(process_key, {}).get('started_at', datetime.now().isoformat()),
-            'completed_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': f'Export error: {str(e)}'
-        }
+        finish_status(processing_status, process_key, 'failed', f'Export error: {str(e)}')
 
-# Projects endpoints
-from flask import Blueprint, Response, jsonify, request, send_from_directory, send_file
-import os
-import json
-import shutil
-import subprocess
-import threading
-import time
-from datetime import datetime
-from werkzeug.utils import secure_filename
-from pathlib import Path
+def reset_directory(path):
+    """Remove a directory tree and recreate it empty"""
+    shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
 
-project_bp = Blueprint('project', __name__)
+def collect_matching_files(path, pattern, matches):
+    """Recursively gather files under path whose name matches the compiled pattern, grouped by directory"""
+    files = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                collect_matching_files(entry.path, pattern, matches)
+            elif pattern.match(entry.name):
+                files.append(entry.path)
+    if files:
+        matches.append(files)
+    return matches
 
-def export_project_background(project_name, processing_status):
-    """Background function to export/archive a project"""
-    process_key = f"{project_name}_export"
+def remove_files(paths):
+    """Remove the given files, returning how many were removed"""
+    removed_count = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed_count += 1
+        except OSError:
+            pass  # Ignore errors
+    return removed_count
+
+def remove_matching_files(path, pattern):
+    """Remove files under path whose name matches the compiled pattern, returning the count"""
+    groups = collect_matching_files(path, pattern, [])
+    if len(groups) <= 1:
+        return sum(remove_files(group) for group in groups)
     
-    try:
-        processing_status[process_key] = {
-            'status': 'processing',
-            'started_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': 'Starting export process...'
-        }
-        
-        # Import the archive function from m10_archive
-        from m10_archive import archive_dataset
-        
-        processing_status[process_key]['progress'] = 50
-        processing_status[process_key]['message'] = 'Archiving dataset...'
-        
-        success = archive_dataset(project_name)
-        
-        if success:
-            processing_status[process_key] = {
-                'status': 'completed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': 'Export completed successfully'
-            }
-        else:
-            processing_status[process_key] = {
-                'status': 'failed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 0,
-                'message': 'Export failed'
-            }
-            
-    except Exception as e:
-        processing_status[process_key] = {
-            'status': 'failed',
-            'started_at': processing_status.get(process_key, {}).get('started_at', datetime.now().isoformat()),
-            'completed_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': f'Export error: {str(e)}'
-        }
+    # One task per directory, so unlinks never contend on the same directory
+    with ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2, len(groups))) as executor:
+        return sum(executor.map(remove_files, groups))
 
 def create_project_routes(projects_dir, processing_status):
     """Create and return the project blueprint with injected dependencies"""
@@ -125,13 +85,8 @@ def create_project_routes(projects_dir, processing_status):
     def get_projects():
         """List all project folders"""
         try:
-            projects = []
-            if os.path.exists(projects_dir):
-                for item in os.listdir(projects_dir):
-                    project_path = os.path.join(projects_dir, item)
-                    if os.path.isdir(project_path):
-                        projects.append(item)
-            return jsonify(projects)
+            projects = cached_listing(projects_dir, lambda: fast_listdir(projects_dir))
+            return Response(json_bytes(projects), mimetype='application/json')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -149,20 +104,22 @@ def create_project_routes(projects_dir, processing_status):
             project_name = secure_filename(project_name)
             project_path = os.path.join(projects_dir, project_name)
             
-            if os.path.exists(project_path):
+            # Creating the folder is the existence check, so two requests cannot both succeed
+            try:
+                os.makedirs(project_path, exist_ok=False)
+            except FileExistsError:
                 return jsonify({'error': 'Project already exists'}), 409
             
-            os.makedirs(project_path, exist_ok=True)
-            # Create subdirectories
-            for subdir in ['splits', 'audio', 'raw']:
-                os.makedirs(os.path.join(project_path, subdir), exist_ok=True)
+            # Create subdirectories; the parent is new, so a plain mkdir each is enough
+            for subdir in ('splits', 'audio', 'raw'):
+                os.mkdir(os.path.join(project_path, subdir))
             
             # Save settings if provided
             if settings:
                 settings_path = os.path.join(project_path, 'settings.json')
-                with open(settings_path, 'w') as f:
-                    json.dump(settings, f, indent=2)
+                write_json_atomic(settings_path, settings)
             
+            invalidate_listing(projects_dir)
             return jsonify({'message': f'Project {project_name} created successfully'}), 201
         except Exception as e:
             return jsonify({'error': str(e)}), 500
@@ -179,27 +136,31 @@ def create_project_routes(projects_dir, processing_status):
                 return jsonify({'error': 'New project name is required'}), 400
             
             new_name = secure_filename(new_name)
-            old_path = os.path.join(projects_dir, project_name)
-            new_path = os.path.join(projects_dir, new_name)
+            old_path = project_dir(projects_dir, project_name)
+            new_path = project_dir(projects_dir, new_name)
             
-            if not os.path.exists(old_path):
+            if not os.path.isdir(old_path):
                 return jsonify({'error': 'Project not found'}), 404
             
-            if new_name != project_name and os.path.exists(new_path):
-                return jsonify({'error': 'Project with new name already exists'}), 409
-            
             # Update settings if provided
             if settings:
                 settings_path = os.path.join(old_path, 'settings.json')
-                with open(settings_path, 'w') as f:
-                    json.dump(settings, f, indent=2)
+                write_json_atomic(settings_path, settings)
             
             # Rename project folder if name changed
             if new_name != project_name:
-                os.rename(old_path, new_path)
+                # Fails atomically if the target exists, no separate exists check
+                try:
+                    atomic_rename_noreplace(old_path, new_path)
+                except FileExistsError:
+                    return jsonify({'error': 'Project with new name already exists'}), 409
+                ensure_dir.cache_clear()
+                invalidate_listing(projects_dir)
                 return jsonify({'message': f'Project renamed from {project_name} to {new_name}'}), 200
             else:
                 return jsonify({'message': f'Project {project_name} updated successfully'}), 200
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -207,13 +168,17 @@ def create_project_routes(projects_dir, processing_status):
     def delete_project(project_name):
         """Delete a project folder"""
         try:
-            project_path = os.path.join(projects_dir, project_name)
+            project_path = project_dir(projects_dir, project_name)
             
-            if not os.path.exists(project_path):
+            try:
+                shutil.rmtree(project_path)
+            except FileNotFoundError:
                 return jsonify({'error': 'Project not found'}), 404
-            
-            shutil.rmtree(project_path)
+            ensure_dir.cache_clear()
+            invalidate_listing(projects_dir)
             return jsonify({'message': f'Project {project_name} deleted successfully'}), 200
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -224,7 +189,10 @@ def create_project_routes(projects_dir, processing_status):
         try:
             settings_path = os.path.join(projects_dir, project_name, 'settings.json')
             
-            if not os.path.exists(settings_path):
+            # Send the stored JSON as is; send_file adds ETag/Last-Modified and answers 304s
+            try:
+                return send_file(settings_path, mimetype='application/json', conditional=True, etag=True)
+            except FileNotFoundError:
                 # Return default settings if file doesn't exist
                 default_settings = {
                     'silenceThreshold': -40,
@@ -236,11 +204,6 @@ def create_project_routes(projects_dir, processing_status):
                     'joinSubsegments': False
                 }
                 return jsonify(default_settings)
-            
-            with open(settings_path, 'r') as f:
-                settings = json.load(f)
-            
-            return jsonify(settings)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -258,8 +221,7 @@ def create_project_routes(projects_dir, processing_status):
             
             settings_path = os.path.join(project_path, 'settings.json')
             
-            with open(settings_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            write_json_atomic(settings_path, data)
             
             return jsonify({'message': 'Settings saved successfully'}), 200
         except Exception as e:
@@ -286,44 +248,30 @@ def create_project_routes(projects_dir, processing_status):
             clean_silences = data.get('silences', False)
             clean_other = data.get('other', False)
             
-            project_path = os.path.join(projects_dir, project_name)
-            if not os.path.exists(project_path):
+            project_path = project_dir(projects_dir, project_name)
+            if not os.path.isdir(project_path):
                 return jsonify({'error': 'Project not found'}), 404
             
             # Track what was cleaned
             cleaned_items = []
             
-            # Directory-level cleaning
-            if clean_splits:
-                splits_dir = os.path.join(project_path, 'splits')
-                if os.path.exists(splits_dir):
-                    shutil.rmtree(splits_dir)
-                    os.makedirs(splits_dir, exist_ok=True)
-                    cleaned_items.append('splits directory')
-                    
-            if clean_audio:
-                audio_dir = os.path.join(project_path, 'audio')
-                if os.path.exists(audio_dir):
-                    shutil.rmtree(audio_dir)
-                    os.makedirs(audio_dir, exist_ok=True)
-                    cleaned_items.append('audio directory')
-                    
-            if clean_raw:
-                raw_dir = os.path.join(project_path, 'raw')
-                if os.path.exists(raw_dir):
-                    shutil.rmtree(raw_dir)
-                    os.makedirs(raw_dir, exist_ok=True)
-                    cleaned_items.append('raw directory')
-                    
-            if clean_output:
-                output_dir = os.path.join(project_path, 'output')
-                if os.path.exists(output_dir):
-                    shutil.rmtree(output_dir)
-                    os.makedirs(output_dir, exist_ok=True)
-                    cleaned_items.append('output directory')
+            # Directory-level cleaning; the trees are disjoint, so reset them in parallel
+            subdirs = {subdir: os.path.join(project_path, subdir) for subdir in ('splits', 'audio', 'raw', 'output')}
+            reset_dirs = []
+            for enabled, subdir in ((clean_splits, 'splits'), (clean_audio, 'audio'), (clean_raw, 'raw'), (clean_output, 'output')):
+                if enabled and os.path.exists(subdirs[subdir]):
+                    reset_dirs.append(subdirs[subdir])
+                    cleaned_items.append(f'{subdir} directory')
+            
+            if reset_dirs:
+                with ThreadPoolExecutor(max_workers=len(reset_dirs)) as executor:
+                    list(executor.map(reset_directory, reset_dirs))
+            
+            # Cached directories may have just been removed
+            ensure_dir.cache_clear()
             
             # File type-level cleaning (only in splits directory)
-            splits_dir = os.path.join(project_path, 'splits')
+            splits_dir = subdirs['splits']
             if os.path.exists(splits_dir):
                 file_patterns = []
                 
@@ -341,32 +289,23 @@ def create_project_routes(projects_dir, processing_status):
                 if clean_other:
                     file_patterns.extend(['*.txt', '*.log', '*.tmp'])
                     
-                # Remove matching files
+                # Remove matching files, one compiled regex for all patterns
                 removed_count = 0
-                for root, dirs, files in os.walk(splits_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        for pattern in file_patterns:
-                            import fnmatch
-                            if fnmatch.fnmatch(file, pattern):
-                                try:
-                                    os.remove(file_path)
-                                    removed_count += 1
-                                except OSError:
-                                    pass  # Ignore errors
+                if file_patterns:
+                    combined = re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in file_patterns))
+                    removed_count = remove_matching_files(splits_dir, combined)
                 
                 if removed_count > 0:
                     cleaned_items.append(f'{removed_count} processing files')
             
             # Handle project-level speaker database cleaning
             if clean_speakers:
-                speaker_db_path = os.path.join(project_path, 'speaker_db.npy')
-                if os.path.exists(speaker_db_path):
-                    try:
-                        os.remove(speaker_db_path)
-                        cleaned_items.append('project speaker database')
-                    except OSError:
-                        pass  # Ignore errors
+                # Single unlink instead of an exists check + remove
+                try:
+                    os.remove(os.path.join(project_path, 'speaker_db.npy'))
+                    cleaned_items.append('project speaker database')
+                except OSError:
+                    pass  # Missing, or cannot be removed
             
             if not cleaned_items:
                 return jsonify({'message': 'No items were selected for cleaning'}), 200
@@ -376,6 +315,8 @@ def create_project_routes(projects_dir, processing_status):
                 'cleaned': cleaned_items
             }), 200
                 
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -385,16 +326,13 @@ def create_project_routes(projects_dir, processing_status):
         try:
             # Check if already processing
             process_key = f"{project_name}_export"
-            if process_key in processing_status and processing_status[process_key]['status'] == 'processing':
+            if is_processing(processing_status, process_key):
                 return jsonify({'error': 'Export is already in progress for this project'}), 409
 
             # Start background processing
-            thread = threading.Thread(
-                target=export_project_background,
-                args=(project_name, processing_status)
-            )
-            thread.daemon = True
-            thread.start()
+            if submit_job(JOB_EXECUTOR, process_key, export_project_background, project_name, processing_status,
+                          processing_status=processing_status) is None:
+                return jsonify({'error': 'Export is already in progress for this project'}), 409
 
             return jsonify({
                 'message': f'Export started for project {project_name}',
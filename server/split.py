@@ -1,41 +1,139 @@
-from flask import Blueprint, Response, jsonify, request, send_from_directory, send_file
+from flask import Blueprint, Response, current_app, jsonify, request, send_from_directory, send_file
 import os
+import re
+import bisect
+import collections
+import fnmatch
+import functools
+import gzip
+import itertools
 import json
 import shutil
+import stat
 import subprocess
+import sys
 import threading
 import time
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from pathlib import Path
-from run import process_file
-import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 from typing import List, Dict, Any
+from done_marker import already_processed
+from server.utils import UnsafePathError, safe_join, project_dir, project_file, ensure_dir, fast_listdir, write_json_atomic, write_bytes_atomic, dir_etag, entries_etag, json_bytes, json_loads, LRUCache, LISTING_CACHE_SIZE
+from server.jobs import PROCESS_EXECUTOR, JOB_EXECUTOR, process_file_background, submit_run_all, update_status, finish_status, submit_job, is_processing, active_keys
 
 split_bp = Blueprint('split', __name__)
 
+# Encoded get_splits responses: split folder path -> (dir_etag, JSON bytes)
+_splits_cache = LRUCache(LISTING_CACHE_SIZE)
+
+# Audio extensions picked up by the run routes (matched case-insensitively)
+RAW_AUDIO_SUFFIXES = frozenset({'.mp3', '.wav', '.m4a', '.flac', '.ogg'})
+PROJECT_AUDIO_SUFFIXES = frozenset({'.wav', '.mp3', '.m4a'})
+
+def has_suffix(name, suffixes):
+    """Case-insensitive match of name's extension against a set of lower-case suffixes; only the extension is lower-cased"""
+    return os.path.splitext(name)[1].lower() in suffixes
+
+# Segment exports at least this large are gzipped for clients that accept it
+EXPORT_GZIP_MIN_SIZE = 1024
+
+# Per-split processing files that can be cleaned, named <split file><suffix>.
+# speaker_db.npy is project-level, not per-split, so it is not listed
+PROCESSING_FILE_SUFFIXES = (
+    '_silences.json',
+    '_transcription.json',
+    '_pyannote.csv',
+    '_pyannote.rttm',
+    '_3dspeaker.csv',
+    '_3dspeaker.rttm',
+    '_wespeaker.csv',
+    '_wespeaker.rttm',
+    '_segments.json',
+    '_segments_raw.json',
+)
+
+@functools.lru_cache(maxsize=512)
+def processing_file_names(base_name):
+    """Names of the cleanable processing files for one split file"""
+    return frozenset(base_name + suffix for suffix in PROCESSING_FILE_SUFFIXES)
+
+# Split-level files removed per file type by clean_granular (the speaker DB is project-level)
+CLEAN_FILE_PATTERNS = {
+    'transcriptions': '*_transcription.json',
+    'speakers': '*_pyannote.*',
+    'segments': '*_segments.json',
+    'silences': '*_silences.json',
+    'wespeaker': '*_wespeaker.*',
+    '3dspeaker': '*_3dspeaker.*'
+}
+
+@functools.lru_cache(maxsize=64)
+def clean_file_matcher(file_types):
+    """Compiled match function for names covered by any of file_types (a sorted tuple of CLEAN_FILE_PATTERNS keys)"""
+    return re.compile('|'.join(f'(?:{fnmatch.translate(CLEAN_FILE_PATTERNS[file_type])})' for file_type in file_types)).match
+
+@functools.lru_cache(maxsize=128)
+def _read_json(file_path, mtime_ns):
+    """Parse a JSON file; mtime_ns is part of the cache key so edits are picked up.
+    Results are shared between callers and must not be mutated"""
+    with open(file_path, 'rb') as f:
+        return json_loads(f.read())
+
+def remove_entries(entries):
+    """Remove (path, is_dir) entries: directory trees with rmtree, files with os.remove"""
+    for path, is_dir in entries:
+        if is_dir:
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+def remove_entry_groups(groups):
+    """Remove groups of entries concurrently, one task per group (unlink and rmtree release the GIL)"""
+    if len(groups) <= 1:
+        for entries in groups:
+            remove_entries(entries)
+        return
+    
+    # One task per directory, so unlinks never contend on the same directory
+    with ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) * 2, len(groups))) as executor:
+        list(executor.map(remove_entries, groups))
+
 def load_project_settings(projects_dir, project_name):
-    """Load project settings from settings.json file"""
+    """Load project settings from settings.json file (cached until the file changes)"""
     settings_file = os.path.join(projects_dir, project_name, 'settings.json')
     settings = {}
     
-    if os.path.exists(settings_file):
-        try:
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
-            print(f"Loaded settings from {settings_file}")
-        except json.JSONDecodeError as e:
-            print(f"Warning: Error parsing settings.json: {e}")
-            print("Using default settings")
-        except Exception as e:
-            print(f"Warning: Error reading settings.json: {e}")
-            print("Using default settings")
-    else:
-        print(f"No settings.json found in project directory, using default settings")
+    try:
+        settings = _read_json(settings_file, os.stat(settings_file).st_mtime_ns)
+        current_app.logger.debug("Loaded settings from %s", settings_file)
+    except FileNotFoundError:
+        current_app.logger.debug("No settings.json found in project directory, using default settings")
+    except json.JSONDecodeError as e:
+        current_app.logger.warning("Error parsing settings.json: %s, using default settings", e)
+    except Exception as e:
+        current_app.logger.warning("Error reading settings.json: %s, using default settings", e)
     
     return settings
 
+# Run run_all.py as a subprocess rather than in the warm run_all worker process
+RUN_ALL_SUBPROCESS = os.environ.get('RUN_ALL_SUBPROCESS') == '1'
+
+def run_all_subprocess(argv, tail_lines=200):
+    """Run run_all.py with argv in a child interpreter; returns (exit code, stdout, stderr)
+    with only the last tail_lines lines of each output kept while it runs"""
+    proc = subprocess.Popen([sys.executable, 'run_all.py', *argv],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=os.getcwd())
+    stdout, stderr = collections.deque(maxlen=tail_lines), collections.deque(maxlen=tail_lines)
+    # Drain stderr alongside stdout so neither pipe can fill up and stall the child
+    stderr_reader = threading.Thread(target=stderr.extend, args=(proc.stderr,), daemon=True)
+    stderr_reader.start()
+    stdout.extend(proc.stdout)
+    stderr_reader.join()
+    return proc.wait(), ''.join(stdout), ''.join(stderr)
+
 def run_all_background(project_name, options, projects_dir, processing_status):
     """Background function to run the full run_all.py pipeline with options"""
     run_all_key = f"{project_name}_run_all"
@@ -43,13 +141,13 @@ def run_all_background(project_name, options, projects_dir, processing_status):
     try:
         processing_status[run_all_key] = {
             'status': 'processing',
-            'started_at': datetime.now().isoformat(),
+            'started_at': time.time(),
             'progress': 0,
             'message': 'Starting run_all processing...'
         }
         
         # Build command arguments for run_all.py
-        cmd = ['python', 'run_all.py', project_name]
+        cmd = [sys.executable, 'run_all.py', project_name]
         
         if options.get('override'):
             cmd.append('--override')
@@ -66,104 +164,52 @@ def run_all_background(project_name, options, projects_dir, processing_status):
         if options.get('skip'):
             cmd.append('--skip')
         
-        processing_status[run_all_key]['progress'] = 10
-        processing_status[run_all_key]['message'] = f'Running: {" ".join(cmd)}'
-        
-        # Execute run_all.py script
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
-        
-        processing_status[run_all_key]['progress'] = 90
-        processing_status[run_all_key]['message'] = 'Finalizing run_all processing...'
+        update_status(processing_status, run_all_key, progress=10, message=f'Running: {" ".join(cmd)}')
         
-        if result.returncode == 0:
-            processing_status[run_all_key] = {
-                'status': 'completed',
-                'started_at': processing_status[run_all_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': 'Run all completed successfully',
-                'output': result.stdout[-1000:] if len(result.stdout) > 1000 else result.stdout  # Last 1000 chars
-            }
+        # Run run_all.py in the run_all worker process, which has the pipeline modules imported
+        # already; RUN_ALL_SUBPROCESS=1 starts a fresh interpreter per run instead
+        if RUN_ALL_SUBPROCESS:
+            returncode, stdout, stderr = run_all_subprocess(cmd[2:])
         else:
-            processing_status[run_all_key] = {
-                'status': 'failed',
-                'started_at': processing_status[run_all_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 0,
-                'message': f'Run all failed: {result.stderr[-500:] if result.stderr else "Unknown error"}',
-                'output': result.stdout[-1000:] if len(result.stdout) > 1000 else result.stdout
-            }
-            
-    except Exception as e:
-        processing_status[run_all_key] = {
-            'status': 'failed',
-            'started_at': processing_status.get(run_all_key, {}).get('started_at', datetime.now().isoformat()),
-            'completed_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': f'Run all error: {str(e)}'
-        }
-
-def process_file_background(project_name, filename, file_path, projects_dir, processing_status, override=False, segment=False, settings=None):
-    """Background function to process a file through the pipeline"""
-    process_key = f"{project_name}_{filename}"
-    
-    try:
-        processing_status[process_key] = {
-            'status': 'processing',
-            'started_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': 'Starting processing...'
-        }
-        
-        # Create output directory structure
-        output_dir = os.path.join(projects_dir, project_name, 'splits', filename)
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Import and use the processing functions
-        # Note: We'll need to adapt the _run.py process_file function
-        processing_status[process_key]['progress'] = 10
-        processing_status[process_key]['message'] = 'Cleaning audio...'
+            returncode, stdout, stderr = submit_run_all(cmd[2:]).result()
         
-        # Load project settings if not provided
-        if settings is None:
-            settings = load_project_settings(projects_dir, project_name)
-        
-        # Call the custom processing function
-        success = process_file(file_path, file_path.replace('/raw', '/splits') + '/', override, segment, settings)
+        update_status(processing_status, run_all_key, progress=90, message='Finalizing run_all processing...')
         
-        if success:
-            processing_status[process_key] = {
-                'status': 'completed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 100,
-                'message': 'Processing completed successfully'
-            }
+        if returncode == 0:
+            finish_status(processing_status, run_all_key, 'completed', 'Run all completed successfully',
+                output=stdout[-1000:] if len(stdout) > 1000 else stdout  # Last 1000 chars
+            )
         else:
-            processing_status[process_key] = {
-                'status': 'failed',
-                'started_at': processing_status[process_key]['started_at'],
-                'completed_at': datetime.now().isoformat(),
-                'progress': 0,
-                'message': 'Processing failed'
-            }
+            finish_status(processing_status, run_all_key, 'failed', f'Run all failed: {stderr[-500:] if stderr else "Unknown error"}',
+                output=stdout[-1000:] if len(stdout) > 1000 else stdout
+            )
             
     except Exception as e:
-        processing_status[process_key] = {
-            'status': 'failed',
-            'started_at': processing_status.get(process_key, {}).get('started_at', datetime.now().isoformat()),
-            'completed_at': datetime.now().isoformat(),
-            'progress': 0,
-            'message': f'Error: {str(e)}'
-        }
+        finish_status(processing_status, run_all_key, 'failed', f'Run all error: {str(e)}')
+
+def find_raw_file(raw_dir, name):
+    """Path of raw file name (or name + '.wav') in raw_dir, None if neither is a regular file; UnsafePathError if name leaves raw_dir"""
+    for candidate in (name, name + '.wav'):
+        path = safe_join(raw_dir, candidate)
+        try:
+            # One stat per candidate, no separate exists probe
+            if stat.S_ISREG(os.stat(path).st_mode):
+                return path
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return None
+
+def outputs_up_to_date(raw_file_path, output_dir, settings_path):
+    """Whether the last complete run left its done marker after both the raw file and the project
+    settings last changed, and no output was added or removed since (done_marker.already_processed)"""
+    return already_processed(raw_file_path, output_dir, settings_path, False)
 
 def load_json_file(file_path: Path) -> Dict[str, Any]:
-    """Load JSON data from file."""
-    if not file_path.exists():
-        return None
+    """Load JSON data from file (cached until the file changes; do not mutate the result)."""
     try:
-        with file_path.open('r', encoding='utf-8') as f:
-            return json.load(f)
+        return _read_json(str(file_path), file_path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return None
     except (json.JSONDecodeError, Exception) as e:
         print(f"Warning: Could not load {file_path}: {e}")
         return None
@@ -173,123 +219,240 @@ def get_time_range_from_segments(segments: List[Dict[str, Any]]) -> tuple:
     if not segments:
         return 0, 0
     
-    start_times = []
-    end_times = []
-    
+    # One pass with running bounds instead of collecting every start and end first
+    start_ms = end_ms = None
     for seg in segments:
         main_data = seg.get('main', {})
-        start_times.append(main_data.get('start_ms', 0))
-        end_times.append(main_data.get('end_ms', 0))
+        seg_start = main_data.get('start_ms', 0)
+        seg_end = main_data.get('end_ms', 0)
+        if start_ms is None or seg_start < start_ms:
+            start_ms = seg_start
+        if end_ms is None or seg_end > end_ms:
+            end_ms = seg_end
     
-    return min(start_times), max(end_times)
-
-def filter_silences_in_range(silences_data: List[Dict[str, Any]], start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
-    """Filter silence intervals to only those within the given time range."""
-    filtered = []
-    for silence in silences_data:
-        silence_start = silence.get('start', 0)
-        silence_end = silence.get('end', 0)
-        # Include silence if it overlaps with the time range
-        if silence_start < end_ms and silence_end > start_ms:
-            filtered.append(silence)
-    return filtered
-
-def filter_transcription_tokens(transcription_data: List[Dict[str, Any]], start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
-    """Filter transcription tokens to only those within the given time range."""
-    filtered = []
-    for token in transcription_data:
-        token_start = token.get('start', 0) * 1000  # Convert to ms
-        token_end = token.get('end', 0) * 1000  # Convert to ms
-        # Include token if it overlaps with the time range
-        if token_start < end_ms and token_end > start_ms:
-            filtered.append(token)
-    return filtered
+    return start_ms, end_ms
+
+def _interval_bounds(item) -> tuple:
+    """(start, end) of a {'start', 'end'} entry or a [start, end] pair (m2_silences output)"""
+    if isinstance(item, dict):
+        return item.get('start', 0), item.get('end', 0)
+    return item[0], item[1]
+
+@functools.lru_cache(maxsize=32)
+def _read_intervals(file_path: str, mtime_ns: int, scale: int) -> tuple:
+    """Load a list of intervals sorted by start, with start/end times in ms
+    (times multiplied by scale once) and the running maximum of the ends for bisecting"""
+    data = load_json_file(Path(file_path))
+    if not data:
+        return None
+    items = sorted(data, key=lambda item: _interval_bounds(item)[0])
+    bounds = [_interval_bounds(item) for item in items]
+    starts = [start * scale for start, _ in bounds]
+    ends = [end * scale for _, end in bounds]
+    return items, starts, ends, list(itertools.accumulate(ends, max))
+
+def load_intervals(file_path: Path, scale: int = 1) -> tuple:
+    """Interval index for a silences (scale=1, ms) or transcription (scale=1000, seconds) file,
+    cached until the file changes; None if it is missing or empty"""
+    try:
+        mtime_ns = file_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_intervals(str(file_path), mtime_ns, scale)
+
+def filter_intervals_in_range(intervals: tuple, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+    """Entries of a load_intervals index that overlap the given time range."""
+    items, starts, ends, max_ends = intervals
+    # Everything before lo ends by start_ms, everything from hi on starts at or after end_ms
+    lo = bisect.bisect_right(max_ends, start_ms)
+    hi = bisect.bisect_left(starts, end_ms)
+    return [items[i] for i in range(lo, hi) if ends[i] > start_ms]
+
+@functools.lru_cache(maxsize=32)
+def _read_segment_index(file_path: str, mtime_ns: int) -> tuple:
+    """Load a segments file with its segments ordered by seg_idx and the matching seg_idx list for bisecting"""
+    data = load_json_file(Path(file_path))
+    if not data:
+        return None
+    segments = data['segments']
+    seg_ids = [seg['seg_idx'] for seg in segments]
+    # m6_segment writes segments in seg_idx order; only files edited out of order need sorting
+    if any(a > b for a, b in zip(seg_ids, seg_ids[1:])):
+        order = sorted(range(len(seg_ids)), key=seg_ids.__getitem__)
+        segments = [segments[i] for i in order]
+        seg_ids = [seg_ids[i] for i in order]
+    return data, segments, seg_ids
+
+def load_segment_index(file_path: Path) -> tuple:
+    """seg_idx index (data, segments, seg_ids) of a segments file, cached until the file changes;
+    None if it cannot be parsed, FileNotFoundError if it is missing"""
+    return _read_segment_index(str(file_path), file_path.stat().st_mtime_ns)
+
+def select_segments(index: tuple, start_segment: int, end_segment: int) -> List[Dict[str, Any]]:
+    """Segments of a load_segment_index index with start_segment <= seg_idx <= end_segment"""
+    _, segments, seg_ids = index
+    return segments[bisect.bisect_left(seg_ids, start_segment):bisect.bisect_right(seg_ids, end_segment)]
 
 def create_split_routes(projects_dir, processing_status):
     """Create and return the split blueprint with injected dependencies"""
     
+    def start_run_all(project_name, options, filetype, suffixes, missing_error, empty_error):
+        """Start run_all for a project once its filetype folder has audio and none of it is busy; returns the response"""
+        # The directory read itself reports a missing folder, no separate exists probe or stat per entry
+        try:
+            with os.scandir(project_dir(projects_dir, project_name, filetype)) as it:
+                audio_files = [entry.name for entry in it
+                               if entry.is_file() and has_suffix(entry.name, suffixes)]
+        except FileNotFoundError:
+            return jsonify({'error': missing_error}), 404
+        
+        if not audio_files:
+            return jsonify({'error': empty_error}), 404
+        
+        # Check if any files are already being processed, against one set of this project's active keys
+        active = active_keys(processing_status, f"{project_name}_")
+        already_processing = [filename for filename in audio_files if f"{project_name}_{filename}" in active]
+        
+        if already_processing:
+            return jsonify({
+                'error': f'Some files are already being processed: {", ".join(already_processing)}'
+            }), 409
+        
+        # Check if run_all processing is already running
+        run_all_key = f"{project_name}_run_all"
+        if is_processing(processing_status, run_all_key):
+            return jsonify({'error': 'Run all is already in progress for this project'}), 409
+        
+        # Start background run_all processing on the shared job pool
+        if submit_job(JOB_EXECUTOR, run_all_key, run_all_background, project_name, options, projects_dir, processing_status,
+                      processing_status=processing_status) is None:
+            return jsonify({'error': 'Run all is already in progress for this project'}), 409
+        
+        return jsonify({
+            'message': f'Run all started for project {project_name} with {len(audio_files)} files',
+            'files': audio_files,
+            'processing_key': run_all_key,
+            'options': options
+        }), 200
+    
     @split_bp.route('/api/projects/<project_name>/splits/', defaults={'filename': None}, methods=['GET'])
     @split_bp.route('/api/projects/<project_name>/splits/<path:filename>', methods=['GET'])
     def get_splits(project_name, filename):
         """List all mp3/wav files under projects/$project/splits/$filename/"""
         try:
-            print(f"DEBUG: Raw filename received: {filename}")
+            current_app.logger.debug("Raw filename received: %s", filename)
             
             if filename is None:
                 return jsonify({'error': 'Filename is required'}), 400
             
-            # URL decode the filename to handle encoded characters like %2F
-            decoded_filename = urllib.parse.unquote(filename)
-            print(f"DEBUG: URL-decoded filename: {decoded_filename}")
-            
-            splits_path = os.path.join(projects_dir, project_name, 'splits', decoded_filename)
-            print(f"DEBUG: Looking for splits in: {splits_path}")
-            print(f"DEBUG: Path exists: {os.path.exists(splits_path)}")
+            splits_path = project_file(projects_dir, project_name, 'splits', filename)
+            current_app.logger.debug("Looking for splits in: %s", splits_path)
             
-            splits = []
-            
-            if os.path.exists(splits_path):
-                print(f"DEBUG: Directory contents: {os.listdir(splits_path)}")
-                all_audio_files = []
-                for item in os.listdir(splits_path):
-                    if item.lower().endswith(('.mp3', '.wav')):
-                        all_audio_files.append(item)
-                
+            def list_splits():
                 # Filter logic: if there are multiple wav files and one ends with _cleaned_audio.wav,
-                # exclude the _cleaned_audio.wav file from the dropdown
-                cleaned_audio_files = [f for f in all_audio_files if f.endswith('_cleaned_audio.wav')]
-                other_wav_files = [f for f in all_audio_files if f.endswith('.wav') and not f.endswith('_cleaned_audio.wav')]
-                mp3_files = [f for f in all_audio_files if f.endswith('.mp3')]
+                # exclude the _cleaned_audio.wav file from the dropdown. Sorted into the three
+                # groups in the same pass that reads the directory; suffixes are matched
+                # case-sensitively, as they always have been
+                cleaned_audio_files, other_wav_files, mp3_files = [], [], []
+                try:
+                    with os.scandir(splits_path) as it:
+                        for entry in it:
+                            name = entry.name
+                            if name.endswith('.mp3'):
+                                group = mp3_files
+                            elif name.endswith('_cleaned_audio.wav'):
+                                group = cleaned_audio_files
+                            elif name.endswith('.wav'):
+                                group = other_wav_files
+                            else:
+                                continue
+                            if entry.is_file():
+                                group.append(name)
+                except FileNotFoundError:
+                    return []
                 
                 # If there are other wav files besides _cleaned_audio.wav, exclude _cleaned_audio.wav
                 if other_wav_files or mp3_files:
-                    splits = other_wav_files + mp3_files
-                else:
-                    # If only _cleaned_audio.wav exists, include it
-                    splits = cleaned_audio_files
+                    return other_wav_files + mp3_files
+                # If only _cleaned_audio.wav exists, include it
+                return cleaned_audio_files
+            
+            # Answer unchanged polls with 304 before listing anything
+            try:
+                etag = dir_etag(splits_path)
+            except FileNotFoundError:
+                return jsonify([])
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+            
+            # Re-list only when the directory changed since the cached listing was built
+            cached = _splits_cache.get(splits_path)
+            if cached and cached[0] == etag:
+                body = cached[1]
             else:
-                print(f"DEBUG: Directory does not exist: {splits_path}")
+                splits = list_splits()
+                current_app.logger.debug("Found splits: %s", splits)
+                body = json_bytes(splits)
+                _splits_cache[splits_path] = (etag, body)
             
-            print(f"DEBUG: Found splits: {splits}")
-            return jsonify(splits)
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            return response
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
-            print(f"DEBUG: Exception occurred: {str(e)}")
+            current_app.logger.debug("Exception occurred: %s", e)
             return jsonify({'error': str(e)}), 500
 
     @split_bp.route('/api/projects/<project_name>/splits/<path:filename>/refresh', methods=['POST'])
     def refresh_split_file(project_name, filename):
         """Refresh a split file by reprocessing it"""
         try:
-            # URL decode the filename to handle encoded characters like %2F
-            decoded_filename = urllib.parse.unquote(filename)
-            # Look for the file in the raw directory
-            raw_file_path = os.path.join(projects_dir, project_name, 'raw', f"{decoded_filename}")
-            if not os.path.exists(raw_file_path):
-                # Try with .wav extension
-                raw_file_path = os.path.join(projects_dir, project_name, 'raw', f"{decoded_filename}.wav")
-                if not os.path.exists(raw_file_path):
-                    return jsonify({'error': 'Source file not found in raw directory'}), 404
+            # Look for the file in the raw directory; its outputs go to the same relative path under splits
+            project_path = project_dir(projects_dir, project_name)
+            raw_dir = os.path.join(project_path, 'raw')
+            raw_file_path = find_raw_file(raw_dir, filename)
+            if raw_file_path is None:
+                return jsonify({'error': 'Source file not found in raw directory'}), 404
+            output_dir = os.path.join(project_path, 'splits') + raw_file_path[len(raw_dir):]
 
             # Check if already processing
-            process_key = f"{project_name}_{decoded_filename}"
-            if process_key in processing_status and processing_status[process_key]['status'] == 'processing':
+            process_key = f"{project_name}_{filename}"
+            if is_processing(processing_status, process_key):
                 return jsonify({'error': 'File is already being processed'}), 409
 
+            # Skip the rerun when the last run of this server session completed and neither the
+            # raw file, the settings nor the outputs changed since; {"force": true} reprocesses anyway
+            data = request.get_json(silent=True) or {}
+            if (not data.get('force')
+                    and processing_status.get(process_key, {}).get('status') == 'completed'
+                    and outputs_up_to_date(raw_file_path, output_dir, os.path.join(project_path, 'settings.json'))):
+                return jsonify({
+                    'message': f'{filename} is already up to date',
+                    'processing_key': process_key,
+                    'skipped': True
+                }), 200
+
             # Load project settings
             settings = load_project_settings(projects_dir, project_name)
 
-            # Start background processing
-            thread = threading.Thread(
-                target=process_file_background,
-                args=(project_name, decoded_filename, raw_file_path, projects_dir, processing_status, False, False, settings)
-            )
-            thread.daemon = True
-            thread.start()
+            # Start background processing (None: another request started it first)
+            if submit_job(
+                PROCESS_EXECUTOR, process_key, process_file_background,
+                project_name, filename, raw_file_path,
+                output_dir + '/', processing_status, False, False, settings,
+                processing_status=processing_status
+            ) is None:
+                return jsonify({'error': 'File is already being processed'}), 409
 
             return jsonify({
-                'message': f'Processing started for {decoded_filename}',
+                'message': f'Processing started for {filename}',
                 'processing_key': process_key
             }), 200
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         
@@ -297,36 +460,37 @@ def create_split_routes(projects_dir, processing_status):
     def build_split_file(project_name, filename):
         """Build splits"""
         try:
-            # URL decode the filename to handle encoded characters like %2F
-            decoded_filename = urllib.parse.unquote(filename)
-            # Look for the file in the raw directory
-            raw_file_path = os.path.join(projects_dir, project_name, 'raw', f"{decoded_filename}")
-            if not os.path.exists(raw_file_path):
-                # Try with .wav extension
-                raw_file_path = os.path.join(projects_dir, project_name, 'raw', f"{decoded_filename}.wav")
-                if not os.path.exists(raw_file_path):
-                    return jsonify({'error': 'Source file not found in raw directory'}), 404
+            # Look for the file in the raw directory; its outputs go to the same relative path under splits
+            project_path = project_dir(projects_dir, project_name)
+            raw_dir = os.path.join(project_path, 'raw')
+            raw_file_path = find_raw_file(raw_dir, filename)
+            if raw_file_path is None:
+                return jsonify({'error': 'Source file not found in raw directory'}), 404
+            output_dir = os.path.join(project_path, 'splits') + raw_file_path[len(raw_dir):]
 
             # Check if already processing
-            process_key = f"{project_name}_{decoded_filename}"
-            if process_key in processing_status and processing_status[process_key]['status'] == 'processing':
+            process_key = f"{project_name}_{filename}"
+            if is_processing(processing_status, process_key):
                 return jsonify({'error': 'File is already being processed'}), 409
 
             # Load project settings
             settings = load_project_settings(projects_dir, project_name)
 
-            # Start background processing
-            thread = threading.Thread(
-                target=process_file_background,
-                args=(project_name, decoded_filename, raw_file_path, projects_dir, processing_status, False, True, settings)
-            )
-            thread.daemon = True
-            thread.start()
+            # Start background processing (None: another request started it first)
+            if submit_job(
+                PROCESS_EXECUTOR, process_key, process_file_background,
+                project_name, filename, raw_file_path,
+                output_dir + '/', processing_status, False, True, settings,
+                processing_status=processing_status
+            ) is None:
+                return jsonify({'error': 'File is already being processed'}), 409
 
             return jsonify({
-                'message': f'Processing started for {decoded_filename}',
+                'message': f'Processing started for {filename}',
                 'processing_key': process_key
             }), 200
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -346,51 +510,10 @@ def create_split_routes(projects_dir, processing_status):
                 'skip': data.get('skip', False)
             }
 
-            # Get the raw directory path
-            raw_dir_path = os.path.join(projects_dir, project_name, 'raw')
-            if not os.path.exists(raw_dir_path):
-                return jsonify({'error': 'Raw directory not found for project'}), 404
-
-            # Get all audio files in the raw directory
-            audio_files = []
-            for item in os.listdir(raw_dir_path):
-                if item.lower().endswith(('.mp3', '.wav', '.m4a', '.flac', '.ogg')):
-                    audio_files.append(item)
-
-            if not audio_files:
-                return jsonify({'error': 'No audio files found in raw directory'}), 404
-
-            # Check if any files are already being processed
-            already_processing = []
-            for filename in audio_files:
-                process_key = f"{project_name}_{filename}"
-                if process_key in processing_status and processing_status[process_key]['status'] == 'processing':
-                    already_processing.append(filename)
-
-            if already_processing:
-                return jsonify({
-                    'error': f'Some files are already being processed: {", ".join(already_processing)}'
-                }), 409
-
-            # Check if run_all processing is already running
-            run_all_key = f"{project_name}_run_all"
-            if run_all_key in processing_status and processing_status[run_all_key]['status'] == 'processing':
-                return jsonify({'error': 'Run all is already in progress for this project'}), 409
-
-            # Start background run_all processing
-            thread = threading.Thread(
-                target=run_all_background,
-                args=(project_name, options, projects_dir, processing_status)
-            )
-            thread.daemon = True
-            thread.start()
-
-            return jsonify({
-                'message': f'Run all started for project {project_name} with {len(audio_files)} files',
-                'files': audio_files,
-                'processing_key': run_all_key,
-                'options': options
-            }), 200
+            return start_run_all(project_name, options, 'raw', RAW_AUDIO_SUFFIXES,
+                                 'Raw directory not found for project', 'No audio files found in raw directory')
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         
@@ -398,26 +521,23 @@ def create_split_routes(projects_dir, processing_status):
     def get_split_file(project_name, splitnam, filename):
         """Get or update a specific split file"""
         try:
-            # URL decode the splitnam to handle encoded characters like %2F
-            decoded_splitnam = urllib.parse.unquote(splitnam)
-            split_file_path = os.path.join(projects_dir, project_name, 'splits', decoded_splitnam, filename)
+            split_file_path = project_file(projects_dir, project_name, 'splits', splitnam, filename)
             
             if request.method == 'GET':
-                if not os.path.exists(split_file_path):
-                    return jsonify({'error': 'Split file not found'}), 404
-                
-                # if filetype is json return as json
+                # Send the file bytes as stored instead of parsing and re-encoding them;
+                # conditional=True answers If-Modified-Since and Range requests. send_file
+                # stats the path itself, so a missing file surfaces here without a separate probe
                 if filename.endswith('.json'):
-                    with open(split_file_path, 'r') as f:
-                        data = json.load(f)
-                    return jsonify(data)
-                # if filetype is csv return as csv
+                    mimetype = 'application/json'
                 elif filename.endswith('.csv'):
-                    with open(split_file_path, 'r') as f:
-                        data = f.read()
-                    return Response(data, mimetype='text/csv')
+                    mimetype = 'text/csv'
+                else:
+                    mimetype = 'application/octet-stream'
                 
-                return send_file(split_file_path, mimetype='application/octet-stream')
+                try:
+                    return send_file(split_file_path, mimetype=mimetype, conditional=True, etag=True)
+                except (FileNotFoundError, IsADirectoryError):
+                    return jsonify({'error': 'Split file not found'}), 404
             
             elif request.method == 'PUT':
                 # Handle updating files (mainly for JSON files like segments)
@@ -425,16 +545,22 @@ def create_split_routes(projects_dir, processing_status):
                     return jsonify({'error': 'Only JSON files can be updated via PUT'}), 400
                 
                 try:
-                    data = request.get_json()
+                    # Decode the body straight from bytes (orjson when installed) rather than
+                    # through request.get_json and the stdlib decoder
+                    body = request.get_data(cache=False)
+                    data = json_loads(body) if body else None
                     if data is None:
                         return jsonify({'error': 'Invalid JSON data'}), 400
                     
                     # Ensure the directory exists
                     os.makedirs(os.path.dirname(split_file_path), exist_ok=True)
                     
-                    # Write the updated data to the file
-                    with open(split_file_path, 'w') as f:
-                        json.dump(data, f, indent=2)
+                    # The body was only decoded to validate it, so store the bytes as sent
+                    # rather than encoding the data again; ?pretty=1 asks for the indented form
+                    if request.args.get('pretty'):
+                        write_json_atomic(split_file_path, data)
+                    else:
+                        write_bytes_atomic(split_file_path, body)
                     
                     return jsonify({'message': f'File {filename} updated successfully'}), 200
                     
@@ -443,6 +569,8 @@ def create_split_routes(projects_dir, processing_status):
                 except Exception as e:
                     return jsonify({'error': f'Failed to save file: {str(e)}'}), 500
                     
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -450,46 +578,44 @@ def create_split_routes(projects_dir, processing_status):
     def get_cleanable_files(project_name, splitnam, split_file):
         """Get list of processing files that can be cleaned for a specific split"""
         try:
-            # URL decode the splitnam to handle encoded characters like %2F
-            decoded_splitnam = urllib.parse.unquote(splitnam)
-            decoded_split_file = urllib.parse.unquote(split_file)
-            
-            split_dir = os.path.join(projects_dir, project_name, 'splits', decoded_splitnam)
+            split_dir = project_file(projects_dir, project_name, 'splits', splitnam)
             
-            if not os.path.exists(split_dir):
+            # Define processing file patterns based on the split file name
+            base_name = split_file  # Keep the full filename including .wav
+            wanted = processing_file_names(base_name)
+            
+            # One directory read instead of an exists + stat probe per pattern
+            found = {}
+            try:
+                with os.scandir(split_dir) as it:
+                    for entry in it:
+                        if entry.name in wanted and entry.is_file():
+                            found[entry.name] = entry.stat()
+            except FileNotFoundError:
                 return jsonify([]), 200
             
-            # Define processing file patterns based on the split file name
-            base_name = decoded_split_file  # Keep the full filename including .wav
-            
-            # List of potential processing files
-            processing_patterns = [
-                f"{base_name}_silences.json",
-                f"{base_name}_transcription.json", 
-                f"{base_name}_pyannote.csv",
-                f"{base_name}_pyannote.rttm",
-                f"{base_name}_3dspeaker.csv",
-                f"{base_name}_3dspeaker.rttm", 
-                f"{base_name}_wespeaker.csv",
-                f"{base_name}_wespeaker.rttm",
-                f"{base_name}_segments.json",
-                f"{base_name}_segments_raw.json"
-                # Note: speaker_db.npy is now project-level, not per-split
-            ]
-            
-            cleanable_files = []
-            for pattern in processing_patterns:
-                file_path = os.path.join(split_dir, pattern)
-                if os.path.exists(file_path):
-                    file_stats = os.stat(file_path)
-                    cleanable_files.append({
-                        'name': pattern,
-                        'size': file_stats.st_size,
-                        'modified': file_stats.st_mtime
-                    })
-            
-            return jsonify(cleanable_files), 200
+            names = [name for name in (base_name + suffix for suffix in PROCESSING_FILE_SUFFIXES) if name in found]
+            
+            # Pipeline steps rewrite some outputs in place, so the ETag covers each file's size and
+            # mtime rather than the directory mtime
+            etag = entries_etag((name, found[name]) for name in names)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
             
+            cleanable_files = [{
+                'name': name,
+                'size': found[name].st_size,
+                'modified': found[name].st_mtime
+            } for name in names]
+            
+            response = Response(json_bytes(cleanable_files), mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            return response
+            
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -497,10 +623,6 @@ def create_split_routes(projects_dir, processing_status):
     def clean_processing_file(project_name, splitnam, split_file):
         """Delete a specific processing file"""
         try:
-            # URL decode the splitnam to handle encoded characters like %2F
-            decoded_splitnam = urllib.parse.unquote(splitnam)
-            decoded_split_file = urllib.parse.unquote(split_file)
-            
             data = request.get_json()
             if not data or 'filename' not in data:
                 return jsonify({'error': 'Filename is required'}), 400
@@ -508,34 +630,22 @@ def create_split_routes(projects_dir, processing_status):
             filename_to_delete = data['filename']
             
             # Security check: ensure the filename is a valid processing file
-            base_name = decoded_split_file  # Keep the full filename including .wav
-            valid_patterns = [
-                f"{base_name}_silences.json",
-                f"{base_name}_transcription.json", 
-                f"{base_name}_pyannote.csv",
-                f"{base_name}_pyannote.rttm",
-                f"{base_name}_3dspeaker.csv",
-                f"{base_name}_3dspeaker.rttm", 
-                f"{base_name}_wespeaker.csv",
-                f"{base_name}_wespeaker.rttm",
-                f"{base_name}_segments.json"
-                # Note: speaker_db.npy is now project-level, not per-split
-            ]
-            
-            if filename_to_delete not in valid_patterns:
+            base_name = split_file  # Keep the full filename including .wav
+            if filename_to_delete not in processing_file_names(base_name):
                 return jsonify({'error': 'Invalid file for deletion'}), 400
             
-            split_dir = os.path.join(projects_dir, project_name, 'splits', decoded_splitnam)
-            file_path = os.path.join(split_dir, filename_to_delete)
+            file_path = project_file(projects_dir, project_name, 'splits', splitnam, filename_to_delete)
             
-            if not os.path.exists(file_path):
+            # Delete the file; a missing file is reported by the unlink itself
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
                 return jsonify({'error': 'File not found'}), 404
             
-            # Delete the file
-            os.remove(file_path)
-            
             return jsonify({'message': f'Successfully deleted {filename_to_delete}'}), 200
             
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -546,48 +656,10 @@ def create_split_routes(projects_dir, processing_status):
             data = request.get_json()
             options = data.get('options', {}) if data else {}
             
-            # Get list of audio files in project
-            audio_dir = os.path.join(projects_dir, project_name, 'audio')
-            if not os.path.exists(audio_dir):
-                return jsonify({'error': 'Project audio directory not found'}), 404
-            
-            audio_files = [f for f in os.listdir(audio_dir) 
-                          if f.lower().endswith(('.wav', '.mp3', '.m4a'))]
-            
-            if not audio_files:
-                return jsonify({'error': 'No audio files found in project'}), 404
-
-            # Check if any files are already being processed
-            already_processing = []
-            for filename in audio_files:
-                process_key = f"{project_name}_{filename}"
-                if process_key in processing_status and processing_status[process_key]['status'] == 'processing':
-                    already_processing.append(filename)
-
-            if already_processing:
-                return jsonify({
-                    'error': f'Some files are already being processed: {", ".join(already_processing)}'
-                }), 409
-
-            # Check if run_all processing is already running
-            run_all_key = f"{project_name}_run_all"
-            if run_all_key in processing_status and processing_status[run_all_key]['status'] == 'processing':
-                return jsonify({'error': 'Run all is already in progress for this project'}), 409
-
-            # Start background run_all processing
-            thread = threading.Thread(
-                target=run_all_background,
-                args=(project_name, options, projects_dir, processing_status)
-            )
-            thread.daemon = True
-            thread.start()
-
-            return jsonify({
-                'message': f'Run all started for project {project_name} with {len(audio_files)} files',
-                'files': audio_files,
-                'processing_key': run_all_key,
-                'options': options
-            }), 200
+            return start_run_all(project_name, options, 'audio', PROJECT_AUDIO_SUFFIXES,
+                                 'Project audio directory not found', 'No audio files found in project')
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -600,82 +672,81 @@ def create_split_routes(projects_dir, processing_status):
                 return jsonify({'error': 'Request body is required'}), 400
             
             options = data.get('options', {})
-            project_path = os.path.join(projects_dir, project_name)
+            project_path = project_dir(projects_dir, project_name)
             
             if not os.path.exists(project_path):
                 return jsonify({'error': 'Project not found'}), 404
 
             deleted_items = []
 
-            # Clean directories
+            # Clean directories; scandir gives each entry's type without a stat per entry.
+            # Files of a folder form one removal group, each subdirectory tree its own
+            removal_groups = []
             directories = options.get('directories', {})
             for dir_name, should_clean in directories.items():
                 if should_clean:
-                    dir_path = os.path.join(project_path, dir_name)
+                    dir_path = safe_join(project_path, dir_name)
                     if os.path.exists(dir_path):
                         if dir_name == 'output':
                             # For output, only clean files related to this project
-                            output_dir = os.path.join(os.path.dirname(projects_dir), 'output')
-                            project_files = [f for f in os.listdir(output_dir) 
-                                           if f.startswith(project_name)]
-                            for file in project_files:
-                                file_path = os.path.join(output_dir, file)
-                                if os.path.isfile(file_path):
-                                    os.remove(file_path)
-                                    deleted_items.append(f"output/{file}")
-                                elif os.path.isdir(file_path):
-                                    shutil.rmtree(file_path)
-                                    deleted_items.append(f"output/{file}/")
+                            scan_dir, prefix, label = os.path.join(os.path.dirname(projects_dir), 'output'), project_name, 'output'
                         else:
                             # Clean entire directory
-                            for item in os.listdir(dir_path):
-                                item_path = os.path.join(dir_path, item)
-                                if os.path.isfile(item_path):
-                                    os.remove(item_path)
-                                    deleted_items.append(f"{dir_name}/{item}")
-                                elif os.path.isdir(item_path):
-                                    shutil.rmtree(item_path)
-                                    deleted_items.append(f"{dir_name}/{item}/")
-
-            # Clean specific file types
+                            scan_dir, prefix, label = dir_path, '', dir_name
+                        files = []
+                        with os.scandir(scan_dir) as it:
+                            for entry in it:
+                                if not entry.name.startswith(prefix):
+                                    continue
+                                if entry.is_file():
+                                    files.append((entry.path, False))
+                                    deleted_items.append(f"{label}/{entry.name}")
+                                elif entry.is_dir():
+                                    removal_groups.append([(entry.path, True)])
+                                    deleted_items.append(f"{label}/{entry.name}/")
+                        if files:
+                            removal_groups.append(files)
+            remove_entry_groups(removal_groups)
+            
+            # Cached directories may have just been removed
+            ensure_dir.cache_clear()
+
+            # Clean specific file types: one pattern for all selected types, one directory read per split folder
             file_types = options.get('file_types', {})
+            selected_types = tuple(sorted(file_type for file_type, should_clean in file_types.items()
+                                          if should_clean and file_type in CLEAN_FILE_PATTERNS))
             splits_dir = os.path.join(project_path, 'splits')
-            if os.path.exists(splits_dir):
-                for split_folder in os.listdir(splits_dir):
-                    split_path = os.path.join(splits_dir, split_folder)
-                    if os.path.isdir(split_path):
-                        for file_type, should_clean in file_types.items():
-                            if should_clean:
-                                pattern_map = {
-                                    'transcriptions': '*_transcription.json',
-                                    'speakers': '*_pyannote.*',
-                                    'segments': '*_segments.json',
-                                    'silences': '*_silences.json',
-                                    'wespeaker': '*_wespeaker.*',
-                                    '3dspeaker': '*_3dspeaker.*'
-                                    # Note: speaker_db removed from split-level patterns
-                                }
-                                
-                                if file_type in pattern_map:
-                                    pattern = pattern_map[file_type]
-                                    import glob
-                                    files_to_delete = glob.glob(os.path.join(split_path, pattern))
-                                    for file_path in files_to_delete:
-                                        os.remove(file_path)
-                                        deleted_items.append(f"splits/{split_folder}/{os.path.basename(file_path)}")
+            if selected_types:
+                matches = clean_file_matcher(selected_types)
+                removal_groups = []
+                for split_folder in fast_listdir(splits_dir):
+                    files = []
+                    with os.scandir(os.path.join(splits_dir, split_folder)) as it:
+                        for entry in it:
+                            # Like glob, '*' does not match hidden files
+                            if not entry.name.startswith('.') and matches(entry.name) and entry.is_file():
+                                files.append((entry.path, False))
+                                deleted_items.append(f"splits/{split_folder}/{entry.name}")
+                    if files:
+                        removal_groups.append(files)
+                remove_entry_groups(removal_groups)
 
             # Handle project-level speaker database cleaning
             if file_types.get('speakerdb', False):
-                speaker_db_path = os.path.join(project_path, 'speaker_db.npy')
-                if os.path.exists(speaker_db_path):
-                    os.remove(speaker_db_path)
+                # Single unlink instead of an exists check + remove
+                try:
+                    os.remove(os.path.join(project_path, 'speaker_db.npy'))
                     deleted_items.append('speaker_db.npy')
+                except FileNotFoundError:
+                    pass
 
             return jsonify({
                 'message': f'Successfully cleaned {len(deleted_items)} items',
                 'deleted_items': deleted_items
             }), 200
             
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -697,37 +768,31 @@ def create_split_routes(projects_dir, processing_status):
                 return jsonify({'error': 'end_segment must be >= start_segment'}), 400
             
             # Construct the segments file path
-            segments_file = os.path.join(projects_dir, project_name, 'splits', splitnam, f"{filename}_segments.json")
+            segments_file = project_file(projects_dir, project_name, 'splits', splitnam, f"{filename}_segments.json")
             segments_path = Path(segments_file)
             
-            if not segments_path.exists():
+            # Load segments data, indexed by seg_idx (not array position)
+            try:
+                segments_index = load_segment_index(segments_path)
+            except FileNotFoundError:
                 return jsonify({'error': f'Segments file not found: {segments_file}'}), 404
-            
-            # Load segments data
-            segments_data = load_json_file(segments_path)
-            if not segments_data:
+            if not segments_index:
                 return jsonify({'error': f'Could not load segments file: {segments_file}'}), 400
             
-            all_segments = segments_data['segments']
+            segments_data, _, seg_ids = segments_index
             original_audio_path = segments_data.get('audio_path', '')
+            min_seg_id = seg_ids[0] if seg_ids else 1
+            max_seg_id = seg_ids[-1] if seg_ids else 0
             
-            # Validate segment numbers - check available seg_idx values
-            available_seg_ids = [seg['seg_idx'] for seg in all_segments]
-            min_seg_id = min(available_seg_ids) if available_seg_ids else 1
-            max_seg_id = max(available_seg_ids) if available_seg_ids else 0
-            
+            # Validate segment numbers against the available seg_idx values
             if start_segment < min_seg_id or start_segment > max_seg_id:
                 return jsonify({'error': f'start_segment ({start_segment}) not found. Available seg_idx range: {min_seg_id}-{max_seg_id}'}), 400
             
             if end_segment < min_seg_id or end_segment > max_seg_id:
                 return jsonify({'error': f'end_segment ({end_segment}) not found. Available seg_idx range: {min_seg_id}-{max_seg_id}'}), 400
             
-            # Extract the requested segments by seg_idx (not array position)
-            selected_segments = []
-            for segment in all_segments:
-                seg_idx = segment['seg_idx']
-                if start_segment <= seg_idx <= end_segment:
-                    selected_segments.append(segment)
+            # Bisect the requested seg_idx range
+            selected_segments = select_segments(segments_index, start_segment, end_segment)
             
             if not selected_segments:
                 return jsonify({'error': f'No segments found with seg_idx between {start_segment} and {end_segment}'}), 400
@@ -737,34 +802,31 @@ def create_split_routes(projects_dir, processing_status):
             
             # Load raw segments if available
             raw_segments = []
-            original_raw_file = Path(str(segments_path).replace('_segments.json', '_segments_raw.json'))
-            if original_raw_file.exists():
-                raw_segments_data = load_json_file(original_raw_file)
-                if raw_segments_data:
-                    raw_all_segments = raw_segments_data['segments']
-                    # Extract the same range from raw segments by seg_idx
-                    for segment in raw_all_segments:
-                        seg_idx = segment['seg_idx']
-                        if start_segment <= seg_idx <= end_segment:
-                            raw_segments.append(segment)
+            original_raw_file = segments_path.with_name(f"{filename}_segments_raw.json")
+            try:
+                raw_segments_index = load_segment_index(original_raw_file)
+            except FileNotFoundError:
+                raw_segments_index = None
+            if raw_segments_index:
+                # Extract the same range from raw segments by seg_idx
+                raw_segments = select_segments(raw_segments_index, start_segment, end_segment)
             
             # Load silences
             silences = []
-            silences_file = Path(str(segments_path).replace('_segments.json', '_silences.json'))
-            if silences_file.exists():
-                silences_data = load_json_file(silences_file)
-                if silences_data:
-                    # Filter silences to the time range of selected segments
-                    silences = filter_silences_in_range(silences_data, start_ms, end_ms)
+            silences_file = segments_path.with_name(f"{filename}_silences.json")
+            silences_index = load_intervals(silences_file)
+            if silences_index:
+                # Filter silences to the time range of selected segments
+                silences = filter_intervals_in_range(silences_index, start_ms, end_ms)
             
             # Load transcription
             transcription_tokens = []
-            transcription_file = Path(str(segments_path).replace('_segments.json', '_transcription.json'))
-            if transcription_file.exists():
-                transcription_data = load_json_file(transcription_file)
-                if transcription_data:
-                    # Filter transcription tokens to the time range of selected segments
-                    transcription_tokens = filter_transcription_tokens(transcription_data, start_ms, end_ms)
+            transcription_file = segments_path.with_name(f"{filename}_transcription.json")
+            # Token times are in seconds, scaled to ms once when the file is indexed
+            tokens_index = load_intervals(transcription_file, 1000)
+            if tokens_index:
+                # Filter transcription tokens to the time range of selected segments
+                transcription_tokens = filter_intervals_in_range(tokens_index, start_ms, end_ms)
             
             # Create comprehensive output data (same format as m6_get_segment.py)
             output_data = {
@@ -796,18 +858,27 @@ def create_split_routes(projects_dir, processing_status):
             # Generate filename for download
             download_filename = f"visible_segments_{start_segment}_{end_segment}.json"
             
-            # Create response with JSON data
-            response_json = json.dumps(output_data, indent=2, ensure_ascii=False)
+            # Compact JSON: the export is read back by tools, and indenting a large
+            # export costs encode time and a much bigger body
+            body = json_bytes(output_data)
             response = Response(
-                response_json,
+                body,
                 mimetype='application/json',
                 headers={
                     'Content-Disposition': f'attachment; filename="{download_filename}"'
                 }
             )
             
+            # The repeated segment keys compress several-fold; level 1 is nearly as small as the default and much faster
+            response.vary.add('Accept-Encoding')
+            if len(body) >= EXPORT_GZIP_MIN_SIZE and request.accept_encodings['gzip']:
+                response.set_data(gzip.compress(body, compresslevel=1))
+                response.headers['Content-Encoding'] = 'gzip'
+            
             return response
             
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
@@ -1,9 +1,43 @@
-from flask import Blueprint, Response, jsonify, request, send_from_directory, send_file
+from flask import Blueprint, Response, current_app, jsonify, request, send_from_directory, send_file
 import os
-import json
+import time
+from datetime import datetime
+from urllib.parse import quote
+from server.utils import UnsafePathError, json_bytes, project_file
 
 status_bp = Blueprint('status', __name__)
 
+# Seconds between keepalive comments on an idle status stream
+STREAM_KEEPALIVE = 15
+
+# Prefix for status ETags, so versions from before a server restart never match
+STATUS_EPOCH = f'{time.time_ns():x}'
+
+# Encoded get_all_processing_status response: (StatusStore version, JSON bytes)
+_all_status_cache = (None, b'')
+
+# Encoded per-key status responses: process_key -> (status entry, JSON bytes). Writers always
+# swap in a new entry dict (update_status), so the same entry object means the same body
+_status_bodies = {}
+STATUS_BODY_CACHE_SIZE = 2048
+
+def format_status(entry):
+    """Status entry with epoch timestamps rendered as ISO strings for the client"""
+    entry = dict(entry)
+    for field in ('started_at', 'completed_at'):
+        if isinstance(entry.get(field), float):
+            entry[field] = datetime.fromtimestamp(entry[field]).isoformat()
+    return entry
+
+def encode_statuses(version, statuses):
+    """JSON bytes of all statuses at a StatusStore version, encoded once per version for all pollers and streams"""
+    global _all_status_cache
+    cached_version, body = _all_status_cache
+    if cached_version != version:
+        body = json_bytes({key: format_status(entry) for key, entry in statuses.items()})
+        _all_status_cache = (version, body)
+    return body
+
 def create_status_routes(projects_dir, processing_status):
     """Create and return the status blueprint with injected dependencies"""
     
@@ -11,15 +45,15 @@ def create_status_routes(projects_dir, processing_status):
     def get_segments(project_name, filename):
         """Return segments.json for a file"""
         try:
-            segments_path = os.path.join(projects_dir, project_name, 'splits', filename, 'segments.json')
+            segments_path = project_file(projects_dir, project_name, 'splits', filename, 'segments.json')
             
-            if not os.path.exists(segments_path):
+            # Send the stored bytes, segments.json is already valid JSON
+            try:
+                return send_file(segments_path, mimetype='application/json', conditional=True, etag=True)
+            except (FileNotFoundError, NotADirectoryError):
                 return jsonify({'error': 'Segments file not found'}), 404
-            
-            with open(segments_path, 'r') as f:
-                data = json.load(f)
-            
-            return jsonify(data)
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         
@@ -27,12 +61,27 @@ def create_status_routes(projects_dir, processing_status):
     def get_audio(project_name, filename):
         """Return audio.wav for a file"""
         try:
-            audio_path = os.path.join(projects_dir, project_name, 'audio', filename)
+            audio_path = project_file(projects_dir, project_name, 'audio', filename)
             
-            if not os.path.exists(audio_path):
-                return jsonify({'error': 'Audio file not found'}), 404
+            # Behind nginx, hand the file to an internal location aliased to the projects
+            # directory; nginx then serves it (ranges included) without a Flask worker
+            accel_prefix = current_app.config.get('X_ACCEL_REDIRECT_PREFIX')
+            if accel_prefix:
+                if not os.path.isfile(audio_path):
+                    return jsonify({'error': 'Audio file not found'}), 404
+                relative_path = os.path.relpath(audio_path, projects_dir).replace(os.sep, '/')
+                response = Response(mimetype='audio/wav')
+                response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(relative_path)
+                return response
             
-            return send_file(audio_path, mimetype='audio/wav')
+            # conditional=True lets players seek with Range requests and revalidate with 304s;
+            # with USE_X_SENDFILE the front server sends the bytes itself
+            try:
+                return send_file(audio_path, mimetype='audio/wav', conditional=True, etag=True)
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                return jsonify({'error': 'Audio file not found'}), 404
+        except UnsafePathError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -42,10 +91,21 @@ def create_status_routes(projects_dir, processing_status):
         try:
             process_key = f"{project_name}_{filename}"
             
-            if process_key not in processing_status:
+            # Single lookup: a finished entry can be evicted between a membership test and a read
+            entry = processing_status.get(process_key)
+            if entry is None:
                 return jsonify({'error': 'No processing record found'}), 404
             
-            return jsonify(processing_status[process_key])
+            cached = _status_bodies.get(process_key)
+            if cached and cached[0] is entry:
+                body = cached[1]
+            else:
+                body = json_bytes(format_status(entry))
+                if len(_status_bodies) >= STATUS_BODY_CACHE_SIZE:
+                    _status_bodies.clear()
+                _status_bodies[process_key] = (entry, body)
+            
+            return Response(body, mimetype='application/json')
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
@@ -53,6 +113,43 @@ def create_status_routes(projects_dir, processing_status):
     @status_bp.route('/api/processing/status', methods=['GET'])
     def get_all_processing_status():
         """Get all processing statuses"""
-        return jsonify(processing_status)
+        # Every write bumps the store version, so an unchanged version means an unchanged body
+        version = processing_status.version
+        etag = f'{STATUS_EPOCH}-{version}'
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        cached_version, body = _all_status_cache
+        if cached_version != version:
+            version, statuses = processing_status.versioned_snapshot()
+            body = encode_statuses(version, statuses)
+            etag = f'{STATUS_EPOCH}-{version}'
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response
+    
+    @status_bp.route('/api/processing/status/stream', methods=['GET'])
+    def stream_processing_status():
+        """Push all processing statuses as server-sent events whenever one changes"""
+        def generate():
+            version = None
+            while True:
+                new_version, statuses = processing_status.wait_for_change(version, STREAM_KEEPALIVE)
+                if new_version == version:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b': keepalive\n\n'
+                    continue
+                version = new_version
+                payload = encode_statuses(version, statuses)
+                yield b'data: ' + payload + b'\n\n'
+        
+        response = Response(generate(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
     
     return status_bp
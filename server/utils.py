@@ -0,0 +1,255 @@
+# Shared helpers for the server blueprints
+import ctypes
+import ctypes.util
+import errno
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from werkzeug.wsgi import FileWrapper
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# renameat2(2) flags, see linux/fcntl.h and linux/fs.h
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    _renameat2 = _libc.renameat2
+    _renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    _renameat2.restype = ctypes.c_int
+except (OSError, AttributeError):
+    # Not Linux/glibc, or glibc older than 2.28
+    _renameat2 = None
+
+def json_bytes(obj, indent=False):
+    """Encode obj as compact (or with indent=True, 2-space indented) UTF-8 JSON bytes, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def json_loads(data):
+    """Decode JSON bytes or str, using orjson when it is installed (both raise json.JSONDecodeError)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Read size when streaming audio and split files (Werkzeug defaults to 8 KB)
+FILE_BUFFER_SIZE = 256 * 1024
+
+class LargeBufferFileWrapper(FileWrapper):
+    """FileWrapper that reads at least FILE_BUFFER_SIZE bytes per chunk"""
+    
+    def __init__(self, file, buffer_size=8192):
+        super().__init__(file, max(buffer_size, FILE_BUFFER_SIZE))
+
+def large_file_buffers(wsgi_app):
+    """WSGI middleware that streams send_file bodies in FILE_BUFFER_SIZE chunks,
+    unless the server brings its own wsgi.file_wrapper (e.g. gunicorn's sendfile)"""
+    def app(environ, start_response):
+        environ.setdefault('wsgi.file_wrapper', LargeBufferFileWrapper)
+        return wsgi_app(environ, start_response)
+    return app
+
+class _PathLock:
+    """threading.Lock wrapper that can be held in a WeakValueDictionary"""
+    __slots__ = ('_lock', '__weakref__')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+    
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+# One lock per absolute path, dropped once nobody holds a reference to it
+_path_locks = weakref.WeakValueDictionary()
+_path_locks_guard = threading.Lock()
+
+def path_lock(path):
+    """Lock that serializes writers of one file"""
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = _PathLock()
+    return lock
+
+def write_json_atomic(path, data, indent=True):
+    """Write data as JSON (indented, or compact with indent=False) to a temp file next to path, then swap it in with os.replace"""
+    payload = json_bytes(data, indent=indent)
+    with path_lock(path):
+        _replace_file(path, payload)
+
+def write_bytes_atomic(path, payload):
+    """Write payload to a temp file next to path, then swap it in with os.replace"""
+    with path_lock(path):
+        _replace_file(path, payload)
+
+def _replace_file(path, payload):
+    """Write payload to a temp file next to path and rename it over path"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        # mkstemp creates the file 0600; match a normally created file
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def dir_etag(path):
+    """Weak ETag for a directory listing from the directory mtime, which changes whenever an
+    entry is added, removed or renamed (not when a file is rewritten in place)"""
+    return f'{os.stat(path).st_mtime_ns:x}'
+
+def entries_etag(entries):
+    """Weak ETag for (name, stat_result) pairs from each file's size and mtime, which also
+    change when a file is rewritten in place"""
+    digest = hashlib.blake2b(digest_size=8)
+    for name, st in entries:
+        digest.update(b'%s\0%d\0%d\n' % (os.fsencode(name), st.st_size, st.st_mtime_ns))
+    return digest.hexdigest()
+
+class UnsafePathError(ValueError):
+    """Raised when a requested path would resolve outside its base directory"""
+
+def safe_join(base, *parts):
+    """Join parts onto base and refuse results that are not strictly inside base (e.g. via '..' or '.')"""
+    base = os.path.normpath(base)
+    path = os.path.normpath(os.path.join(base, *parts))
+    if path == base or os.path.commonpath([base, path]) != base:
+        raise UnsafePathError('Invalid path')
+    return path
+
+@functools.lru_cache(maxsize=256)
+def project_dir(projects_dir, project_name, filetype=''):
+    """Containment-checked path of a project directory (or one of its filetype subdirectories)"""
+    return safe_join(projects_dir, project_name, filetype)
+
+@functools.lru_cache(maxsize=4096)
+def project_file(projects_dir, project_name, filetype, *parts):
+    """Containment-checked path inside a project's filetype folder, cached for the endpoints the UI polls"""
+    return safe_join(project_dir(projects_dir, project_name, filetype), *parts)
+
+def atomic_rename_noreplace(old, new):
+    """Rename old to new in one step, raising FileExistsError rather than overwriting new"""
+    if _renameat2 is not None:
+        if _renameat2(AT_FDCWD, os.fsencode(old), AT_FDCWD, os.fsencode(new), RENAME_NOREPLACE) == 0:
+            return
+        err = ctypes.get_errno()
+        # EINVAL/ENOSYS: kernel or filesystem without RENAME_NOREPLACE
+        if err not in (errno.EINVAL, errno.ENOSYS):
+            raise OSError(err, os.strerror(err), old)
+    
+    try:
+        # link() also refuses an existing target
+        os.link(old, new)
+    except (FileExistsError, FileNotFoundError):
+        raise
+    except OSError:
+        # Directories and filesystems without hard links
+        if os.path.lexists(new):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), new)
+        os.rename(old, new)
+    else:
+        os.unlink(old)
+
+def fast_listdir(path, kind='dir', suffixes=None):
+    """Names of the subdirectories (kind='dir') or files (kind='file') in path, [] if path is missing
+    
+    Uses the entry type from the directory read itself, so there is no stat per entry.
+    suffixes optionally limits the result to names ending in one of them.
+    """
+    try:
+        it = os.scandir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    with it:
+        if kind == 'dir':
+            names = [entry.name for entry in it if entry.is_dir(follow_symlinks=False)]
+        else:
+            names = [entry.name for entry in it if entry.is_file()]
+    if suffixes:
+        names = [name for name in names if name.endswith(suffixes)]
+    return names
+
+@functools.lru_cache(maxsize=512)
+def ensure_dir(path):
+    """Create path once per process; clear the cache when project folders are removed or renamed"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+# Short-lived cache for directory listings the UI polls: path -> (expires_at, listing)
+LISTING_TTL = 3.0
+LISTING_CACHE_SIZE = 512
+_ttl_listings = {}
+_ttl_lock = threading.Lock()
+
+def cached_listing(path, build, ttl=LISTING_TTL):
+    """Return build() for path, reusing the result for ttl seconds; callers must not mutate it"""
+    now = time.monotonic()
+    with _ttl_lock:
+        hit = _ttl_listings.get(path)
+    if hit and hit[0] > now:
+        return hit[1]
+    
+    listing = build()
+    with _ttl_lock:
+        if len(_ttl_listings) >= LISTING_CACHE_SIZE:
+            for key in [key for key, (expires_at, _) in _ttl_listings.items() if expires_at <= now]:
+                del _ttl_listings[key]
+            if len(_ttl_listings) >= LISTING_CACHE_SIZE:
+                _ttl_listings.clear()
+        _ttl_listings[path] = (now + ttl, listing)
+    return listing
+
+def invalidate_listing(*paths):
+    """Drop cached listings of paths and of everything below them"""
+    with _ttl_lock:
+        for path in paths:
+            prefix = os.path.join(path, '')
+            for key in [key for key in _ttl_listings if key == path or key.startswith(prefix)]:
+                del _ttl_listings[key]
+
+class LRUCache:
+    """Thread-safe mapping that drops the least recently used entry beyond maxsize"""
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
@@ -0,0 +1,112 @@
+"""Completion marker checks in done_marker and the refresh skip built on them (run with python -m pytest from the repo root)"""
+import os
+from concurrent.futures import Future
+
+import pytest
+
+import done_marker
+import server.jobs
+from server.jobs import StatusStore, process_file_background
+from server.split import outputs_up_to_date
+
+# Inputs are dated OLD, the marker NEW, so mtime granularity never decides a test
+OLD_NS = 1_000_000_000 * 10**9
+NEW_NS = OLD_NS + 10**9
+
+def set_mtime(path, ns):
+    os.utime(path, ns=(ns, ns))
+
+@pytest.fixture
+def processed(tmp_path):
+    """(raw file, output dir, settings file) of a file a non-segment run finished"""
+    raw_file = tmp_path / 'raw' / 'a.wav'
+    raw_file.parent.mkdir()
+    raw_file.write_bytes(b'RIFF')
+    output_dir = tmp_path / 'splits' / 'a.wav'
+    output_dir.mkdir(parents=True)
+    (output_dir / 'a_01.wav').write_bytes(b'RIFF')
+    (output_dir / 'a_01.wav_transcription.json').write_text('[]')
+    settings_file = tmp_path / 'settings.json'
+    settings_file.write_text('{}')
+    done_marker.mark_processed(str(output_dir), False)
+    for path in (raw_file, settings_file, output_dir):
+        set_mtime(path, OLD_NS)
+    set_mtime(output_dir / done_marker.DONE_MARKER, NEW_NS)
+    return str(raw_file), str(output_dir), str(settings_file)
+
+def test_unchanged_file_is_skipped(processed):
+    assert done_marker.already_processed(*processed, False)
+
+def test_granular_clean_runs_file_again(processed):
+    raw_file, output_dir, settings_file = processed
+    os.remove(os.path.join(output_dir, 'a_01.wav_transcription.json'))
+    set_mtime(output_dir, NEW_NS + 10**9)
+    assert not done_marker.already_processed(raw_file, output_dir, settings_file, False)
+
+def test_newer_settings_run_file_again(processed):
+    raw_file, output_dir, settings_file = processed
+    set_mtime(settings_file, NEW_NS + 10**9)
+    assert not done_marker.already_processed(raw_file, output_dir, settings_file, False)
+
+def test_missing_settings_do_not_block_skipping(processed):
+    raw_file, output_dir, settings_file = processed
+    os.remove(settings_file)
+    assert done_marker.already_processed(raw_file, output_dir, settings_file, False)
+
+def test_newer_raw_file_runs_again(processed):
+    raw_file, output_dir, settings_file = processed
+    set_mtime(raw_file, NEW_NS + 10**9)
+    assert not done_marker.already_processed(raw_file, output_dir, settings_file, False)
+
+def test_segment_after_plain_run_runs_file_again(processed):
+    raw_file, output_dir, settings_file = processed
+    assert not done_marker.already_processed(raw_file, output_dir, settings_file, True)
+
+def test_plain_run_after_segment_run_is_skipped(processed):
+    raw_file, output_dir, settings_file = processed
+    done_marker.mark_processed(output_dir, True)
+    set_mtime(output_dir, OLD_NS)
+    set_mtime(os.path.join(output_dir, done_marker.DONE_MARKER), NEW_NS)
+    assert done_marker.already_processed(raw_file, output_dir, settings_file, False)
+    assert done_marker.already_processed(raw_file, output_dir, settings_file, True)
+
+def test_unreadable_marker_runs_file_again(processed):
+    raw_file, output_dir, settings_file = processed
+    marker = os.path.join(output_dir, done_marker.DONE_MARKER)
+    with open(marker, 'w') as f:
+        f.write('{')
+    set_mtime(marker, NEW_NS)
+    assert not done_marker.already_processed(raw_file, output_dir, settings_file, False)
+
+@pytest.fixture
+def finished_pipeline(monkeypatch):
+    """submit_pipeline returns an already finished future instead of running process_file"""
+    def submit_pipeline(file_path, output_dir, *args):
+        future = Future()
+        future.set_result(None)
+        return future
+    monkeypatch.setattr(server.jobs, 'submit_pipeline', submit_pipeline)
+
+def test_refresh_run_leaves_marker_for_outputs_up_to_date(tmp_path, finished_pipeline):
+    raw_file = tmp_path / 'raw' / 'a.wav'
+    raw_file.parent.mkdir()
+    raw_file.write_bytes(b'RIFF')
+    output_dir = tmp_path / 'splits' / 'a.wav'
+    settings_file = tmp_path / 'settings.json'
+    assert not outputs_up_to_date(str(raw_file), str(output_dir), str(settings_file))
+    
+    processing_status = StatusStore()
+    process_file_background('proj', 'a.wav', str(raw_file), str(output_dir) + '/', processing_status, False, False, {})
+    assert processing_status['proj_a.wav']['status'] == 'completed'
+    assert outputs_up_to_date(str(raw_file), str(output_dir), str(settings_file))
+    
+    settings_file.write_text('{}')
+    set_mtime(settings_file, os.stat(output_dir / done_marker.DONE_MARKER).st_mtime_ns + 10**9)
+    assert not outputs_up_to_date(str(raw_file), str(output_dir), str(settings_file))
+
+def test_skip_run_leaves_no_marker(tmp_path, finished_pipeline):
+    output_dir = tmp_path / 'splits' / 'a.wav'
+    processing_status = StatusStore()
+    process_file_background('proj', 'a.wav', str(tmp_path / 'a.wav'), str(output_dir), processing_status, False, False, {}, True)
+    assert processing_status['proj_a.wav']['status'] == 'completed'
+    assert not (output_dir / done_marker.DONE_MARKER).exists()
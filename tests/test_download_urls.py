@@ -0,0 +1,52 @@
+"""URL download batches in m0_get and their status in server.files (run with python -m pytest from the repo root)"""
+import asyncio
+
+import pytest
+
+import m0_get
+from server.files import download_urls_background
+from server.jobs import StatusStore
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    """download_mp3 writes a small file instead of fetching url; urls containing 'broken' fail"""
+    def download_mp3(url, file_path, override=False):
+        if 'broken' in url:
+            raise RuntimeError('HTTP 404')
+        with open(file_path, 'wb') as f:
+            f.write(url.encode())
+    monkeypatch.setattr(m0_get, 'download_mp3', download_mp3)
+
+URLS = [
+    'https://a.example/ep1.mp3',
+    'https://b.example/ep1.mp3',
+    'https://a.example/ep2.mp3',
+    'https://a.example/broken.mp3',
+]
+
+def test_name_collision_is_reported_as_skipped(tmp_path, fake_download):
+    result = asyncio.run(m0_get.download_urls(URLS, str(tmp_path)))
+    assert sorted(result['downloaded']) == ['ep1.wav', 'ep2.wav']
+    assert [entry['url'] for entry in result['failed']] == ['https://a.example/broken.mp3']
+    assert result['skipped'] == [{
+        'url': 'https://b.example/ep1.mp3',
+        'reason': 'output name ep1.wav already used by https://a.example/ep1.mp3'
+    }]
+    assert len(result['downloaded']) + len(result['failed']) + len(result['skipped']) == result['total']
+    assert (tmp_path / 'ep1.wav').read_bytes() == b'https://a.example/ep1.mp3'
+
+def test_status_counts_skipped_urls(tmp_path, fake_download):
+    (tmp_path / 'proj').mkdir()
+    processing_status = StatusStore()
+    asyncio.run(download_urls_background('proj', URLS[:3], str(tmp_path), processing_status))
+    entry = processing_status['proj_url_download']
+    assert entry['status'] == 'completed_with_errors'
+    assert entry['message'] == 'Downloaded 2/3 files (1 skipped, output name already used)'
+    assert [skipped['url'] for skipped in entry['skipped']] == ['https://b.example/ep1.mp3']
+
+def test_status_without_problems(tmp_path, fake_download):
+    (tmp_path / 'proj').mkdir()
+    processing_status = StatusStore()
+    asyncio.run(download_urls_background('proj', URLS[:1], str(tmp_path), processing_status))
+    entry = processing_status['proj_url_download']
+    assert (entry['status'], entry['message']) == ('completed', 'Successfully downloaded 1/1 files')
@@ -0,0 +1,69 @@
+"""Background job helpers in server.jobs (run with python -m pytest from the repo root)"""
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from server.jobs import StatusStore, WarmProcessPool
+
+def done(status='completed'):
+    return {'status': status}
+
+def test_status_store_evicts_least_recently_updated_finished_entries():
+    store = StatusStore(maxsize=3)
+    store['a'] = done()
+    store['b'] = done('failed')
+    store['c'] = done()
+    # Updating a moves it to the back, so b is now the oldest finished entry
+    store['a'] = done()
+    store['d'] = done()
+    assert list(store) == ['c', 'a', 'd']
+    store['e'] = done()
+    assert list(store) == ['a', 'd', 'e']
+
+def test_status_store_never_evicts_processing_entries():
+    store = StatusStore(maxsize=2)
+    store['a'] = done('processing')
+    store['b'] = done()
+    store['c'] = done('processing')
+    assert list(store) == ['a', 'c']
+    # With only running jobs left the store grows past maxsize instead of dropping one
+    store['d'] = done('processing')
+    assert list(store) == ['a', 'c', 'd']
+    # Once entries finish, the next write trims back to maxsize
+    store['a'] = done()
+    store['c'] = done()
+    store['e'] = done('processing')
+    assert list(store) == ['d', 'e']
+
+def test_status_store_version_bumps_on_every_write():
+    store = StatusStore()
+    version, snapshot = store.versioned_snapshot()
+    assert (version, snapshot) == (0, {})
+    store['a'] = done('processing')
+    store['a'] = done('processing')
+    assert store.versioned_snapshot() == (2, {'a': done('processing')})
+
+def test_status_store_wait_for_change():
+    store = StatusStore()
+    store['a'] = done('processing')
+    # An older version returns right away, the current one waits for the timeout
+    assert store.wait_for_change(0, timeout=0) == (1, {'a': done('processing')})
+    assert store.wait_for_change(1, timeout=0.01) == (1, {'a': done('processing')})
+    
+    writer = threading.Timer(0.05, store.__setitem__, ('a', done()))
+    writer.start()
+    try:
+        assert store.wait_for_change(1, timeout=30) == (2, {'a': done()})
+    finally:
+        writer.join()
+
+def test_pool_recovers_after_worker_dies():
+    pool = WarmProcessPool(1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result(timeout=60)
+        assert pool.submit(pow, 2, 10).result(timeout=60) == 1024
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -0,0 +1,101 @@
+"""File and project rename routes through each atomic_rename_noreplace path (run with python -m pytest from the repo root)"""
+import errno
+import itertools
+import os
+
+import pytest
+from flask import Flask
+
+import server.utils
+from server.files import create_files_routes
+from server.jobs import StatusStore
+from server.project import create_project_routes
+
+_names = itertools.count()
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    projects_dir = tmp_path_factory.mktemp('projects')
+    app = Flask(__name__)
+    processing_status = StatusStore()
+    app.register_blueprint(create_files_routes(str(projects_dir), processing_status))
+    app.register_blueprint(create_project_routes(str(projects_dir), processing_status))
+    app.config['PROJECTS_DIR'] = projects_dir
+    return app
+
+@pytest.fixture(params=['renameat2', 'link', 'rename'])
+def client(request, app, monkeypatch):
+    """Test client with atomic_rename_noreplace limited to one of its code paths"""
+    if request.param != 'renameat2':
+        monkeypatch.setattr(server.utils, '_renameat2', None)
+    if request.param == 'rename':
+        def no_hard_links(src, dst):
+            raise PermissionError(errno.EPERM, os.strerror(errno.EPERM), src)
+        monkeypatch.setattr(os, 'link', no_hard_links)
+    return app.test_client()
+
+@pytest.fixture
+def project(app):
+    """(name, path) of a fresh project with raw/a.wav, raw/b.wav and splits/a/"""
+    name = f'proj{next(_names)}'
+    path = app.config['PROJECTS_DIR'] / name
+    (path / 'raw').mkdir(parents=True)
+    (path / 'raw' / 'a.wav').write_bytes(b'a')
+    (path / 'raw' / 'b.wav').write_bytes(b'b')
+    (path / 'splits' / 'a').mkdir(parents=True)
+    return name, path
+
+def test_rename_file(client, project):
+    name, path = project
+    response = client.put(f'/api/projects/{name}/files/raw/a.wav', json={'name': 'c.wav'})
+    assert response.status_code == 200
+    assert not (path / 'raw' / 'a.wav').exists()
+    assert (path / 'raw' / 'c.wav').read_bytes() == b'a'
+
+def test_rename_file_onto_existing_file(client, project):
+    name, path = project
+    response = client.put(f'/api/projects/{name}/files/raw/a.wav', json={'name': 'b.wav'})
+    assert response.status_code == 409
+    assert (path / 'raw' / 'a.wav').read_bytes() == b'a'
+    assert (path / 'raw' / 'b.wav').read_bytes() == b'b'
+
+def test_rename_missing_file(client, project):
+    name, path = project
+    response = client.put(f'/api/projects/{name}/files/raw/missing.wav', json={'name': 'c.wav'})
+    assert response.status_code == 404
+    assert not (path / 'raw' / 'c.wav').exists()
+
+def test_rename_directory(client, project):
+    name, path = project
+    (path / 'splits' / 'a' / 'a_01.wav').write_bytes(b'a')
+    response = client.put(f'/api/projects/{name}/files/splits/a', json={'name': 'c'})
+    assert response.status_code == 200
+    assert not (path / 'splits' / 'a').exists()
+    assert (path / 'splits' / 'c' / 'a_01.wav').read_bytes() == b'a'
+
+def test_rename_directory_onto_existing_directory(client, project):
+    name, path = project
+    (path / 'splits' / 'b').mkdir()
+    response = client.put(f'/api/projects/{name}/files/splits/a', json={'name': 'b'})
+    assert response.status_code == 409
+    assert (path / 'splits' / 'a').is_dir()
+
+def test_rename_project(client, project):
+    name, path = project
+    response = client.put(f'/api/projects/{name}', json={'name': f'{name}_renamed'})
+    assert response.status_code == 200
+    assert not path.exists()
+    assert (path.parent / f'{name}_renamed' / 'raw' / 'a.wav').read_bytes() == b'a'
+
+def test_rename_project_onto_existing_project(client, project, app):
+    name, path = project
+    other = app.config['PROJECTS_DIR'] / f'{name}_other'
+    other.mkdir()
+    response = client.put(f'/api/projects/{name}', json={'name': other.name})
+    assert response.status_code == 409
+    assert (path / 'raw' / 'a.wav').exists()
+    assert not any(other.iterdir())
+
+def test_rename_missing_project(client):
+    response = client.put('/api/projects/missing', json={'name': 'missing_renamed'})
+    assert response.status_code == 404
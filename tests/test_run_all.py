@@ -0,0 +1,34 @@
+"""Skipping already processed files in run_all.main (run with python -m pytest from the repo root)"""
+import pytest
+
+run_all = pytest.importorskip('run_all')
+
+from done_marker import DONE_MARKER
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Project 'proj' with one raw file under tmp_path/projects; process_file only records its calls"""
+    raw_dir = tmp_path / 'projects' / 'proj' / 'raw'
+    raw_dir.mkdir(parents=True)
+    (raw_dir / 'a.wav').write_bytes(b'RIFF')
+    calls = []
+    monkeypatch.setattr(run_all, '__file__', str(tmp_path / 'run_all.py'))
+    monkeypatch.setattr(run_all, 'process_file', lambda file_path, *args: calls.append(file_path))
+    return tmp_path / 'projects' / 'proj' / 'splits' / 'a.wav', calls
+
+def test_skip_run_writes_no_marker(project):
+    output_dir, calls = project
+    run_all.main(['proj', '--skip'])
+    assert len(calls) == 1
+    assert not (output_dir / DONE_MARKER).exists()
+    run_all.main(['proj'])
+    assert len(calls) == 2
+
+def test_complete_run_is_skipped_next_time(project):
+    output_dir, calls = project
+    run_all.main(['proj'])
+    assert (output_dir / DONE_MARKER).exists()
+    run_all.main(['proj'])
+    assert len(calls) == 1
+    run_all.main(['proj', '--override'])
+    assert len(calls) == 2
@@ -0,0 +1,86 @@
+"""Bisect-based interval and segment selection in server.split against plain linear filters"""
+import json
+import random
+
+import pytest
+
+from server.split import load_intervals, filter_intervals_in_range, load_segment_index, select_segments
+
+def linear_filter(data, start_ms, end_ms, scale=1):
+    """Entries overlapping [start_ms, end_ms) by one pass over the file order (the export's filter before bisecting)"""
+    filtered = []
+    for item in data:
+        item_start, item_end = (item.get('start', 0), item.get('end', 0)) if isinstance(item, dict) else item
+        if item_start * scale < end_ms and item_end * scale > start_ms:
+            filtered.append(item)
+    return filtered
+
+def by_start(items):
+    """Stable sort by start, the order load_intervals keeps entries in"""
+    return sorted(items, key=lambda item: item['start'] if isinstance(item, dict) else item[0])
+
+def random_intervals(rng, count, span):
+    """Unsorted intervals with nested, touching and zero-length entries"""
+    intervals = []
+    for _ in range(count):
+        start = rng.randint(0, span)
+        length = rng.choice((0, rng.randint(1, 10), rng.randint(1, span)))
+        intervals.append((start, start + length))
+    return intervals
+
+def random_ranges(rng, count, span):
+    for _ in range(count):
+        a, b = rng.randint(-5, span + 5), rng.randint(-5, span + 5)
+        yield (a, b) if rng.random() < 0.9 else (b, a)
+
+def write_json(path, data):
+    path.write_text(json.dumps(data))
+    return path
+
+@pytest.mark.parametrize('seed', range(20))
+def test_silence_dicts_match_linear_filter(tmp_path, seed):
+    rng = random.Random(seed)
+    data = [{'start': start, 'end': end} for start, end in random_intervals(rng, rng.randint(1, 60), 500)]
+    index = load_intervals(write_json(tmp_path / f'silences_{seed}.json', data))
+    for start_ms, end_ms in random_ranges(rng, 50, 500):
+        assert filter_intervals_in_range(index, start_ms, end_ms) == by_start(linear_filter(data, start_ms, end_ms))
+
+@pytest.mark.parametrize('seed', range(20))
+def test_silence_pairs_match_linear_filter(tmp_path, seed):
+    rng = random.Random(seed)
+    data = [[start, end] for start, end in random_intervals(rng, rng.randint(1, 60), 500)]
+    index = load_intervals(write_json(tmp_path / f'silences_{seed}.json', data))
+    for start_ms, end_ms in random_ranges(rng, 50, 500):
+        assert filter_intervals_in_range(index, start_ms, end_ms) == by_start(linear_filter(data, start_ms, end_ms))
+
+@pytest.mark.parametrize('seed', range(20))
+def test_transcription_seconds_match_linear_filter(tmp_path, seed):
+    rng = random.Random(seed)
+    data = [{'text': str(i), 'start': start / 100, 'end': end / 100}
+            for i, (start, end) in enumerate(random_intervals(rng, rng.randint(1, 60), 5000))]
+    index = load_intervals(write_json(tmp_path / f'transcription_{seed}.json', data), 1000)
+    for start_ms, end_ms in random_ranges(rng, 50, 50000):
+        assert filter_intervals_in_range(index, start_ms, end_ms) == by_start(linear_filter(data, start_ms, end_ms, 1000))
+
+def test_nested_interval_found_after_inner_one_ends(tmp_path):
+    # [0, 100) contains [10, 20); a range after 20 still has to find the outer interval
+    data = [{'start': 10, 'end': 20}, {'start': 0, 'end': 100}, {'start': 30, 'end': 40}]
+    index = load_intervals(write_json(tmp_path / 'nested.json', data))
+    assert filter_intervals_in_range(index, 25, 35) == [{'start': 0, 'end': 100}, {'start': 30, 'end': 40}]
+    assert filter_intervals_in_range(index, 50, 60) == [{'start': 0, 'end': 100}]
+
+def test_missing_or_empty_interval_file(tmp_path):
+    assert load_intervals(tmp_path / 'missing.json') is None
+    assert load_intervals(write_json(tmp_path / 'empty.json', [])) is None
+
+@pytest.mark.parametrize('seed', range(20))
+def test_select_segments_matches_linear_filter(tmp_path, seed):
+    rng = random.Random(seed)
+    seg_ids = rng.sample(range(200), rng.randint(1, 80))
+    if seed % 2:
+        seg_ids.sort()
+    segments = [{'seg_idx': seg_idx, 'main': {'start_ms': seg_idx * 10}} for seg_idx in seg_ids]
+    index = load_segment_index(write_json(tmp_path / f'segments_{seed}.json', {'segments': segments}))
+    for first, last in random_ranges(rng, 50, 200):
+        expected = sorted((seg for seg in segments if first <= seg['seg_idx'] <= last), key=lambda seg: seg['seg_idx'])
+        assert select_segments(index, first, last) == expected
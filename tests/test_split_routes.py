@@ -0,0 +1,65 @@
+"""Split routes with a literal '%' in folder and file names (run with python -m pytest from the repo root)"""
+import os
+from urllib.parse import quote
+
+import pytest
+from flask import Flask
+
+from server.jobs import StatusStore
+from server.split import create_split_routes
+
+SPLIT_FOLDER = 'a%20b.wav'
+SPLIT_FILE = 'x%41_01.wav'
+
+def encode(name):
+    """Encode a path segment once, like encodeURIComponent in the web UI"""
+    return quote(name, safe='')
+
+@pytest.fixture(scope='module')
+def split_dir(tmp_path_factory):
+    split_dir = tmp_path_factory.mktemp('projects') / 'proj' / 'splits' / SPLIT_FOLDER
+    split_dir.mkdir(parents=True)
+    (split_dir / SPLIT_FILE).write_bytes(b'RIFF')
+    (split_dir / f'{SPLIT_FILE}_segments.json').write_text('{"segments": []}')
+    return split_dir
+
+@pytest.fixture(scope='module')
+def client(split_dir):
+    app = Flask(__name__)
+    app.register_blueprint(create_split_routes(str(split_dir.parents[2]), StatusStore()))
+    return app.test_client()
+
+def test_list_split_folder_with_percent(client):
+    response = client.get(f'/api/projects/proj/splits/{encode(SPLIT_FOLDER)}')
+    assert response.status_code == 200
+    assert response.get_json() == [SPLIT_FILE]
+
+def test_get_split_file_with_percent(client):
+    response = client.get(f'/api/projects/proj/splits/{encode(SPLIT_FOLDER)}/{encode(SPLIT_FILE)}_segments.json')
+    assert response.status_code == 200
+    assert response.get_json() == {'segments': []}
+
+def test_cleanable_with_percent(client):
+    response = client.get(f'/api/projects/proj/splits/{encode(SPLIT_FOLDER)}/{encode(SPLIT_FILE)}/cleanable')
+    assert response.status_code == 200
+    assert [entry['name'] for entry in response.get_json()] == [f'{SPLIT_FILE}_segments.json']
+
+def test_cleanable_changes_when_file_is_rewritten_in_place(client, split_dir):
+    url = f'/api/projects/proj/splits/{encode(SPLIT_FOLDER)}/{encode(SPLIT_FILE)}/cleanable'
+    silences = split_dir / f'{SPLIT_FILE}_silences.json'
+    silences.write_text('[]')
+    first = client.get(url)
+    assert client.get(url, headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    
+    # Rewrite in place (no new directory entry), like m2_silences does
+    dir_mtime = split_dir.stat().st_mtime_ns
+    with open(silences, 'r+') as f:
+        f.write('[[0, 10]]')
+    os.utime(silences, ns=(silences.stat().st_mtime_ns + 10**9,) * 2)
+    assert split_dir.stat().st_mtime_ns == dir_mtime
+    
+    second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    sizes = {entry['name']: entry['size'] for entry in second.get_json()}
+    assert sizes[silences.name] == len('[[0, 10]]')
+    silences.unlink()
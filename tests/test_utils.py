@@ -0,0 +1,28 @@
+"""Shared server helpers in server.utils (run with python -m pytest from the repo root)"""
+import json
+
+import pytest
+
+import server.utils
+from server.utils import json_bytes, write_json_atomic
+
+DATA = {'name': 'Žiga čaka', 'speakers': ['Ana', 'Špela']}
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    """Run a test with orjson (when installed) and with the stdlib fallback"""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(server.utils, 'ORJSON_AVAILABLE', False)
+    return request.param
+
+@pytest.mark.parametrize('indent', [True, False])
+def test_write_json_atomic_matches_json_bytes(tmp_path, encoder, indent):
+    path = tmp_path / 'settings.json'
+    write_json_atomic(str(path), DATA, indent=indent)
+    payload = path.read_bytes()
+    assert payload == json_bytes(DATA, indent=indent)
+    # Raw UTF-8 in both forms, never \\u escapes
+    assert 'Žiga'.encode('utf-8') in payload
+    assert json.loads(payload) == DATA
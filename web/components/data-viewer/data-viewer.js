@@ -67,14 +67,14 @@ class DataViewer {
             
             // Load all data types using the selected split name
             const [silencesRes, transcriptionsRes, pyannoteRes, wespeakerRes, threeDSpeakerRes, segmentsRes, rawSegmentsRes, audioRes] = await Promise.all([
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_silences.json`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_transcription.json`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_pyannote.csv`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_wespeaker.csv`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_3dspeaker.csv`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_segments.json`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}_segments_raw.json`).catch(() => ({ok: false})),
-                fetch(`/api/projects/${project}/splits/${filename}/${splitname}`).catch(() => ({ok: false}))
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_silences.json`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_transcription.json`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_pyannote.csv`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_wespeaker.csv`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_3dspeaker.csv`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_segments.json`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_segments_raw.json`).catch(() => ({ok: false})),
+                fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}`).catch(() => ({ok: false}))
             ]);
 
             // Parse responses
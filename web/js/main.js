@@ -135,7 +135,7 @@ class PodcastManager {
         if (!this.currentProject || !filename) return;
 
         try {
-            const response = await fetch(`/api/projects/${this.currentProject}/splits/${filename}`);
+            const response = await fetch(`/api/projects/${this.currentProject}/splits/${encodeURIComponent(filename)}`);
             const splits = await response.json();
             
             if (response.ok && dataSplitSelect) {
@@ -722,43 +722,139 @@ async function submitUrls() {
     }
 }
 
-async function monitorUrlDownload(processKey) {
-    const checkStatus = async () => {
+// Handlers following the processing statuses. All of them share one server-sent
+// events connection per page (or one polling loop when streaming fails), so
+// watchers do not each hold one of the browser's few connections per origin.
+const statusWatchers = new Set();
+let statusSource = null;
+let statusPolling = false;
+
+// Call handler(statuses); drop it when it returns false (or throws)
+function runStatusWatcher(handler, statuses) {
+    let keepWatching = false;
+    try {
+        keepWatching = handler(statuses);
+    } catch (error) {
+        console.error('Error in processing status handler:', error);
+    }
+    if (!keepWatching) {
+        statusWatchers.delete(handler);
+    }
+}
+
+// Close the shared stream once nobody is watching
+function closeIdleStatusSource() {
+    if (statusWatchers.size === 0 && statusSource) {
+        statusSource.close();
+        statusSource = null;
+    }
+}
+
+function dispatchProcessingStatus(statuses) {
+    for (const handler of [...statusWatchers]) {
+        runStatusWatcher(handler, statuses);
+    }
+    closeIdleStatusSource();
+}
+
+async function fetchProcessingStatus() {
+    const response = await fetch('/api/processing/status');
+    return response.ok ? response.json() : null;
+}
+
+function startStatusPolling(pollInterval, firstDelay = pollInterval) {
+    if (statusPolling) {
+        return;
+    }
+    statusPolling = true;
+    
+    const poll = async () => {
         try {
-            const response = await fetch('/api/processing/status');
-            const statuses = await response.json();
-            
-            if (response.ok && statuses[processKey]) {
-                const status = statuses[processKey];
-                
-                if (status.status === 'processing') {
-                    podcastManager.showMessage(`Download in progress: ${status.message}`);
-                    setTimeout(checkStatus, 3000);
-                } else if (status.status === 'completed') {
-                    podcastManager.showMessage(`Download completed: ${status.message}`);
-                    // Refresh the file list
-                    const globalProjectSelect = document.getElementById('globalProjectSelect');
-                    if (globalProjectSelect.value) {
-                        globalProjectSelect.dispatchEvent(new Event('change'));
-                    }
-                } else if (status.status === 'completed_with_errors') {
-                    podcastManager.showMessage(`Download completed with errors: ${status.message}`, true);
-                    // Refresh the file list
-                    const globalProjectSelect = document.getElementById('globalProjectSelect');
-                    if (globalProjectSelect.value) {
-                        globalProjectSelect.dispatchEvent(new Event('change'));
-                    }
-                } else if (status.status === 'failed') {
-                    podcastManager.showMessage(`Download failed: ${status.message}`, true);
-                }
+            const statuses = await fetchProcessingStatus();
+            if (statuses) {
+                dispatchProcessingStatus(statuses);
             }
         } catch (error) {
-            console.error('Error checking download status:', error);
+            console.error('Error checking processing status:', error);
+        }
+        
+        if (statusWatchers.size > 0) {
+            setTimeout(poll, pollInterval);
+        } else {
+            statusPolling = false;
         }
     };
+    setTimeout(poll, firstDelay);
+}
+
+// Follow all processing statuses, falling back to polling.
+// handler(statuses) returns true to keep watching.
+function watchProcessingStatus(handler, pollInterval = 3000) {
+    statusWatchers.add(handler);
+    
+    if (statusPolling) {
+        return;
+    }
+    
+    if (statusSource) {
+        // The open stream only sends changes; bring the new handler up to date first
+        fetchProcessingStatus().then((statuses) => {
+            if (statuses && statusWatchers.has(handler)) {
+                runStatusWatcher(handler, statuses);
+                closeIdleStatusSource();
+            }
+        }).catch((error) => console.error('Error checking processing status:', error));
+        return;
+    }
     
-    // Start checking status
-    setTimeout(checkStatus, 1000);
+    if (!window.EventSource) {
+        // First poll right away, then every pollInterval
+        startStatusPolling(pollInterval, 0);
+        return;
+    }
+    
+    statusSource = new EventSource('/api/processing/status/stream');
+    statusSource.onmessage = (event) => {
+        dispatchProcessingStatus(JSON.parse(event.data));
+    };
+    statusSource.onerror = () => {
+        // Stream dropped or unsupported (e.g. a buffering proxy), poll instead
+        statusSource.close();
+        statusSource = null;
+        startStatusPolling(pollInterval);
+    };
+}
+
+async function monitorUrlDownload(processKey) {
+    watchProcessingStatus((statuses) => {
+        const status = statuses[processKey];
+        // The download job may not have recorded its status yet
+        if (!status) {
+            return true;
+        }
+        
+        if (status.status === 'processing') {
+            podcastManager.showMessage(`Download in progress: ${status.message}`);
+            return true;
+        } else if (status.status === 'completed') {
+            podcastManager.showMessage(`Download completed: ${status.message}`);
+            // Refresh the file list
+            const globalProjectSelect = document.getElementById('globalProjectSelect');
+            if (globalProjectSelect.value) {
+                globalProjectSelect.dispatchEvent(new Event('change'));
+            }
+        } else if (status.status === 'completed_with_errors') {
+            podcastManager.showMessage(`Download completed with errors: ${status.message}`, true);
+            // Refresh the file list
+            const globalProjectSelect = document.getElementById('globalProjectSelect');
+            if (globalProjectSelect.value) {
+                globalProjectSelect.dispatchEvent(new Event('change'));
+            }
+        } else if (status.status === 'failed') {
+            podcastManager.showMessage(`Download failed: ${status.message}`, true);
+        }
+        return false;
+    });
 }
 
 async function runAllFiles() {
@@ -877,49 +973,38 @@ async function startRunAllProcessing() {
 async function monitorMultipleProcessing(project, filenames) {
     const processKeys = filenames.map(filename => `${project}_${filename}`);
     
-    const checkStatuses = async () => {
-        try {
-            const response = await fetch('/api/processing/status');
-            const statuses = await response.json();
-            
-            if (response.ok) {
-                let completedCount = 0;
-                let failedCount = 0;
-                let processingCount = 0;
-                
-                for (const processKey of processKeys) {
-                    if (statuses[processKey]) {
-                        const status = statuses[processKey];
-                        if (status.status === 'completed') {
-                            completedCount++;
-                        } else if (status.status === 'failed') {
-                            failedCount++;
-                        } else if (status.status === 'processing') {
-                            processingCount++;
-                        }
-                    }
-                }
-                
-                if (processingCount > 0) {
-                    podcastManager.showMessage(`Processing ${project}: ${completedCount}/${processKeys.length} completed, ${processingCount} in progress`);
-                    // Check again in 3 seconds
-                    setTimeout(checkStatuses, 3000);
-                } else {
-                    // All processing finished
-                    if (failedCount > 0) {
-                        podcastManager.showMessage(`Processing completed for ${project}: ${completedCount} successful, ${failedCount} failed. Check processing status for details.`, failedCount > completedCount);
-                    } else {
-                        podcastManager.showMessage(`All files processed successfully for ${project}!`);
-                    }
-                    podcastManager.loadProcessingStatus();
+    watchProcessingStatus((statuses) => {
+        let completedCount = 0;
+        let failedCount = 0;
+        let processingCount = 0;
+        
+        for (const processKey of processKeys) {
+            if (statuses[processKey]) {
+                const status = statuses[processKey];
+                if (status.status === 'completed') {
+                    completedCount++;
+                } else if (status.status === 'failed') {
+                    failedCount++;
+                } else if (status.status === 'processing') {
+                    processingCount++;
                 }
             }
-        } catch (error) {
-            console.error('Error checking processing statuses:', error);
         }
-    };
-    
-    checkStatuses();
+        
+        if (processingCount > 0) {
+            podcastManager.showMessage(`Processing ${project}: ${completedCount}/${processKeys.length} completed, ${processingCount} in progress`);
+            return true;
+        }
+        
+        // All processing finished
+        if (failedCount > 0) {
+            podcastManager.showMessage(`Processing completed for ${project}: ${completedCount} successful, ${failedCount} failed. Check processing status for details.`, failedCount > completedCount);
+        } else {
+            podcastManager.showMessage(`All files processed successfully for ${project}!`);
+        }
+        podcastManager.loadProcessingStatus();
+        return false;
+    });
 }
 
 async function cleanProject() {
@@ -1091,32 +1176,25 @@ async function exportProject() {
 async function monitorExportProcessing(project) {
     const processKey = `${project}_export`;
     
-    const checkStatus = async () => {
-        try {
-            const response = await fetch('/api/processing/status');
-            const statuses = await response.json();
-            
-            if (response.ok && statuses[processKey]) {
-                const status = statuses[processKey];
-                
-                if (status.status === 'processing') {
-                    podcastManager.showMessage(`Exporting ${project}: ${status.progress}% - ${status.message}`);
-                    // Check again in 2 seconds
-                    setTimeout(checkStatus, 2000);
-                } else if (status.status === 'completed') {
-                    podcastManager.showMessage(`Export completed for ${project}! Check the output directory.`);
-                    podcastManager.loadProcessingStatus();
-                } else if (status.status === 'failed') {
-                    podcastManager.showMessage(`Export failed for ${project}: ${status.message}`, true);
-                    podcastManager.loadProcessingStatus();
-                }
-            }
-        } catch (error) {
-            console.error('Error checking export status:', error);
+    watchProcessingStatus((statuses) => {
+        const status = statuses[processKey];
+        // The export job may not have recorded its status yet
+        if (!status) {
+            return true;
         }
-    };
-    
-    checkStatus();
+        
+        if (status.status === 'processing') {
+            podcastManager.showMessage(`Exporting ${project}: ${status.progress}% - ${status.message}`);
+            return true;
+        } else if (status.status === 'completed') {
+            podcastManager.showMessage(`Export completed for ${project}! Check the output directory.`);
+            podcastManager.loadProcessingStatus();
+        } else if (status.status === 'failed') {
+            podcastManager.showMessage(`Export failed for ${project}: ${status.message}`, true);
+            podcastManager.loadProcessingStatus();
+        }
+        return false;
+    });
 }
 
 async function refreshFile() {
@@ -1134,13 +1212,26 @@ async function refreshFile() {
     }
 
     try {
-        const response = await fetch(`/api/projects/${project}/splits/${filename}/refresh`, {
+        let response = await fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/refresh`, {
             method: 'POST'
         });
-
-        const result = await response.json();
+        let result = await response.json();
+        
+        // The server skips files whose outputs are newer than the raw file and settings
+        if (response.ok && result.skipped && confirm(`${result.message}. Reprocess it anyway?`)) {
+            response = await fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/refresh`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ force: true })
+            });
+            result = await response.json();
+        }
+        
         if (response.ok) {
             podcastManager.showMessage(result.message);
+            if (result.skipped) {
+                return;
+            }
             if (result.processing_key) {
                 // Start monitoring the processing status
                 monitorProcessing(project, filename);
@@ -1154,30 +1245,27 @@ async function refreshFile() {
 }
 
 async function monitorProcessing(project, filename) {
-    const checkStatus = async () => {
-        try {
-            const response = await fetch(`/api/projects/${project}/processing/${filename}/status`);
-            const status = await response.json();
-            
-            if (response.ok) {
-                if (status.status === 'processing') {
-                    podcastManager.showMessage(`Processing ${filename}: ${status.progress}% - ${status.message}`);
-                    // Check again in 2 seconds
-                    setTimeout(checkStatus, 2000);
-                } else if (status.status === 'completed') {
-                    podcastManager.showMessage(`Processing completed for ${filename}!`);
-                    podcastManager.loadProcessingStatus();
-                } else if (status.status === 'failed') {
-                    podcastManager.showMessage(`Processing failed for ${filename}: ${status.message}`, true);
-                    podcastManager.loadProcessingStatus();
-                }
-            }
-        } catch (error) {
-            console.error('Error checking status:', error);
-        }
-    };
+    const processKey = `${project}_${filename}`;
     
-    checkStatus();
+    watchProcessingStatus((statuses) => {
+        const status = statuses[processKey];
+        // The processing job may not have recorded its status yet
+        if (!status) {
+            return true;
+        }
+        
+        if (status.status === 'processing') {
+            podcastManager.showMessage(`Processing ${filename}: ${status.progress}% - ${status.message}`);
+            return true;
+        } else if (status.status === 'completed') {
+            podcastManager.showMessage(`Processing completed for ${filename}!`);
+            podcastManager.loadProcessingStatus();
+        } else if (status.status === 'failed') {
+            podcastManager.showMessage(`Processing failed for ${filename}: ${status.message}`, true);
+            podcastManager.loadProcessingStatus();
+        }
+        return false;
+    });
 }
 
 function loadProcessingStatus() {
@@ -90,7 +90,7 @@ class SegmentsManager {
                 }))
             };
 
-            const response = await fetch(`/api/projects/${project}/splits/${filename}/${splitname}_segments.json`, {
+            const response = await fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}_segments.json`, {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json',
@@ -156,7 +156,7 @@ class SegmentsManager {
         try {
             podcastManager.showMessage(`Exporting ${visibleSegments.length} visible segments (${minSegId}-${maxSegId})...`);
             
-            const response = await fetch(`/api/projects/${project}/splits/${filename}/${splitname}/export-visible-segments`, {
+            const response = await fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/${encodeURIComponent(splitname)}/export-visible-segments`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -212,7 +212,7 @@ async function buildSplits() {
     }
 
     try {
-        const response = await fetch(`/api/projects/${project}/splits/${filename}/build`, {
+        const response = await fetch(`/api/projects/${project}/splits/${encodeURIComponent(filename)}/build`, {
             method: 'POST'
         });
 